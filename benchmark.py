@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Render benchmarks for DayTracker, run headless on a RecordingCanvas (and, for the
+bar's full redraw path, a RecordingLabel).
+
+    python benchmark.py                   # run and compare against the stored baseline
+    python benchmark.py --update-baseline # run and store the results as the new baseline
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from daytracker import BarScene, ConfigManager, DaySchedule, RingScene, RecordingCanvas, TrackerBar
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+BAR_HEIGHTS = (250, 840, 1440)
+TIMER_COUNTS = (1, 5, 10, 20)
+LABEL_MODES = ("Percentage", "Time Remaining")
+GRADIENT = ("#1E90FF", "#00FFFF")
+SOLID = ("#1E90FF", "#1E90FF")
+
+# Counters are deterministic and compared strictly; rates depend on the machine
+RATE_METRICS = ("redraws_per_sec", "ticks_per_sec")
+
+def bench_bar(height, colors, width=10, radius=0, hours=16):
+    """Depletes a bar one pixel row per frame, rendering every frame twice (changed, then identical)."""
+    canvas = RecordingCanvas(); scene = BarScene(canvas)
+    scene.render(width, height, radius, "#2B2B2B", *colors, 100.0, hours)
+    cold = canvas.stats(); canvas.reset()
+
+    frames = 0; start = time.perf_counter()
+    for row in range(1, height + 1):
+        percentage = 100.0 * (height - row) / height
+        for _ in range(2):
+            scene.render(width, height, radius, "#2B2B2B", *colors, percentage, hours); frames += 1
+    elapsed = time.perf_counter() - start
+    steady = canvas.stats()
+    return {
+        "cold_calls": cold["calls"], "cold_items": cold["created"],
+        "calls_per_frame": round(steady["calls"] / frames, 3),
+        "items_created_per_frame": round(steady["created"] / frames, 3),
+        "items_deleted_per_frame": round(steady["deleted"] / frames, 3),
+        "redraws_per_sec": round(frames / elapsed) if elapsed > 0 else 0,
+    }
+
+class RecordingLabel:
+    """Headless stand-in for the bar's tk.Label that counts the Tk calls made on it."""
+    def __init__(self): self.calls = 0
+    def config(self, **options): self.calls += 1
+    def place(self, **options): self.calls += 1
+    def place_forget(self): self.calls += 1
+
+class HeadlessBar(TrackerBar):
+    """A TrackerBar without a window, so _redraw_canvas() runs as is on recording stand-ins."""
+    def __init__(self, config_manager, width, height, hours):
+        self.config_manager = config_manager; self.size = (width, height)
+        self.schedule = DaySchedule(config_manager)
+        self.canvas = RecordingCanvas(); self.scene = BarScene(self.canvas); self.label = RecordingLabel()
+        self.current_percentage = 100.0; self.total_work_seconds = self.time_remaining_seconds = hours * 3600
+        self._label_text = None; self._label_visible = False; self._last_frame_key = None
+        self._fade = self._drawn_colors = None; self.painted = True; self.report_startup = False
+
+    def winfo_width(self): return self.size[0]
+    def winfo_height(self): return self.size[1]
+
+def bench_redraw(height, mode, width=10, hours=16):
+    """Depletes a bar one pixel row per frame through TrackerBar._redraw_canvas(), label included."""
+    config = ConfigManager()
+    config.config = config._deep_merge_dicts({}, ConfigManager.DEFAULT_CONFIG) # Not the user's config file
+    config.set("behavior.display_mode", mode); config.set("behavior.show_text_label", True)
+    config.set("geometry.width", width); config.set("geometry.height", height)
+    bar = HeadlessBar(config, width, height, hours)
+    bar._redraw_canvas()
+    cold_calls = bar.canvas.calls + bar.label.calls; bar.canvas.reset(); bar.label.calls = 0
+
+    frames = 0; start = time.perf_counter()
+    for row in range(1, height + 1):
+        bar.current_percentage = 100.0 * (height - row) / height
+        bar.time_remaining_seconds = bar.total_work_seconds * (height - row) / height
+        bar._redraw_canvas(); frames += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "cold_calls": cold_calls,
+        "canvas_calls_per_frame": round(bar.canvas.calls / frames, 3),
+        "label_calls_per_frame": round(bar.label.calls / frames, 3),
+        "items_created_per_frame": round(bar.canvas.created / frames, 3),
+        "redraws_per_sec": round(frames / elapsed) if elapsed > 0 else 0,
+    }
+
+def bench_timers(count, duration=300, size=100, ring_width=12, segments=0):
+    """Ticks `count` open timers once per simulated second until they run out."""
+    canvases = [RecordingCanvas() for _ in range(count)]
+    scenes = [RingScene(canvas) for canvas in canvases]
+    for scene in scenes: scene.render(size, size, ring_width, segments, "#444444", "#FF4500", "#FFD700", 1.0)
+    cold_calls = sum(c.calls for c in canvases); cold_items = sum(c.created for c in canvases)
+    for canvas in canvases: canvas.reset()
+
+    start = time.perf_counter()
+    for second in range(1, duration + 1):
+        fraction = (duration - second) / duration
+        for scene in scenes: scene.render(size, size, ring_width, segments, "#444444", "#FF4500", "#FFD700", fraction)
+    elapsed = time.perf_counter() - start
+    return {
+        "cold_calls": cold_calls, "cold_items": cold_items,
+        "calls_per_tick": round(sum(c.calls for c in canvases) / duration, 3),
+        "items_created_per_tick": round(sum(c.created for c in canvases) / duration, 3),
+        "ticks_per_sec": round(duration / elapsed) if elapsed > 0 else 0,
+    }
+
+def run_suite(repeat=3):
+    """Runs every scenario `repeat` times and keeps the best rate of each."""
+    scenarios = {}
+    for height in BAR_HEIGHTS:
+        for name, colors in (("gradient", GRADIENT), ("solid", SOLID)):
+            scenarios[f"bar/{name}/{height}px"] = lambda h=height, c=colors: bench_bar(h, c)
+        for mode in LABEL_MODES:
+            scenarios[f"redraw/{mode.split()[0].lower()}/{height}px"] = lambda h=height, m=mode: bench_redraw(h, m)
+    for count in TIMER_COUNTS:
+        scenarios[f"timers/{count}"] = lambda n=count: bench_timers(n)
+
+    results = {}
+    for name, run in scenarios.items():
+        best = None
+        for _ in range(repeat):
+            result = run()
+            if best is None: best = result
+            for metric in RATE_METRICS:
+                if metric in result: best[metric] = max(best[metric], result[metric])
+        results[name] = best
+    return results
+
+def compare(results, baseline, rate_tolerance):
+    """Returns (regressions, warnings) as lists of human-readable lines."""
+    regressions, warnings = [], []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            warnings.append(f"{name}: no baseline"); continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if old is None: continue
+            if metric in RATE_METRICS:
+                if old and value < old * (1 - rate_tolerance):
+                    warnings.append(f"{name} {metric}: {value} vs baseline {old}")
+            elif value > old:
+                regressions.append(f"{name} {metric}: {value} vs baseline {old}")
+    return regressions, warnings
+
+def print_table(results):
+    for name, metrics in results.items():
+        print(f"{name:<24} " + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless render benchmarks for DayTracker.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the best rate is kept")
+    parser.add_argument("--rate-tolerance", type=float, default=0.3, help="allowed slowdown before a rate is flagged")
+    parser.add_argument("--strict-rates", action="store_true", help="treat slower rates as regressions, not warnings")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.repeat)
+    print_table(results)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f: json.dump(results, f, indent=4, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+    with open(args.baseline, 'r') as f: baseline = json.load(f)
+    regressions, warnings = compare(results, baseline, args.rate_tolerance)
+    if args.strict_rates: regressions, warnings = regressions + warnings, []
+    for line in warnings: print(f"WARNING: {line}")
+    for line in regressions: print(f"REGRESSION: {line}")
+    if not regressions: print("\nNo regressions against the baseline.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,145 @@
 Advanced Always-On-Top Vertical Time Tracker
 Author: Samer
 """
-import tkinter as tk
-from tkinter import ttk, colorchooser, messagebox
-import datetime
-import threading
 import time
+_IMPORT_START = time.perf_counter()
+import datetime
 import json
 import os
-import copy
+import sys
 import math
+import functools
+from collections import OrderedDict, deque
+from bisect import bisect_right
+
+# --- Profiling ---
+class Profiler:
+    """Rolling timing stats for the hot paths, kept per section name.
+
+    Each section keeps its last WINDOW samples, which is enough for p50/p99 and
+    calls per minute. While disabled, @profiled functions cost one attribute check.
+    """
+    WINDOW = 2000
+    DUMP_FILE = "daytracker_profile.json"
+
+    def __init__(self):
+        self.enabled = False
+        self.sections = {}
+
+    def record(self, name, seconds):
+        samples = self.sections.get(name)
+        if samples is None: samples = self.sections.setdefault(name, deque(maxlen=self.WINDOW))
+        samples.append((time.monotonic(), seconds))
+
+    def reset(self): self.sections = {}
+
+    def stats(self):
+        now = time.monotonic(); result = {}
+        for name, samples in list(self.sections.items()):
+            samples = list(samples)
+            if not samples: continue
+            durations = sorted(d for _, d in samples)
+            pick = lambda q: durations[min(len(durations) - 1, int(q * len(durations)))]
+            result[name] = {
+                'samples': len(durations),
+                'calls_per_min': sum(1 for t, _ in samples if now - t <= 60),
+                'p50_ms': round(pick(0.50) * 1000, 3), 'p99_ms': round(pick(0.99) * 1000, 3),
+                'max_ms': round(durations[-1] * 1000, 3),
+            }
+        return result
+
+    def dump(self, path=None, extra=None):
+        """Writes the current stats (plus any `extra` counters) as JSON; returns the path."""
+        path = path or self.DUMP_FILE
+        data = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'), 'sections': self.stats()}
+        if extra: data.update(extra)
+        with open(path, 'w') as f: json.dump(data, f, indent=4)
+        return path
+
+PROFILER = Profiler()
+
+def profiled(name):
+    """Times the decorated function under `name` while PROFILER is enabled."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled: return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: PROFILER.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+# --- Error Reporting ---
+ERROR_COUNTS = {} # "where: error" -> times caught; shown with the profiler counters
+MAX_ERROR_KINDS = 50 # Past this many distinct errors, new ones are counted by type only
+
+def report_error(where):
+    """For except blocks that keep running: prints the traceback the first time an error
+    is seen in `where` and only counts its repeats, so a tick that fails every frame
+    doesn't flood stderr."""
+    e = sys.exc_info()[1]
+    key = f"{where}: {type(e).__name__}: {e}"
+    if key not in ERROR_COUNTS and len(ERROR_COUNTS) >= MAX_ERROR_KINDS: key = f"{where}: {type(e).__name__}"
+    ERROR_COUNTS[key] = ERROR_COUNTS.get(key, 0) + 1
+    if ERROR_COUNTS[key] == 1:
+        import traceback; traceback.print_exc()
+
+# --- Startup Timing ---
+STARTUP_TIMES = {} # stage -> ms since this module started importing
+
+def mark_startup(stage):
+    STARTUP_TIMES.setdefault(stage, round((time.perf_counter() - _IMPORT_START) * 1000, 1))
+
+def startup_report():
+    return ", ".join(f"{stage} {ms} ms" for stage, ms in STARTUP_TIMES.items())
+
+# --- Clock ---
+class Clock:
+    """The time source for schedules, breaks, timers and update ticks.
+
+    Everything that decides what the bar shows reads CLOCK rather than the time
+    module, so --simulate can swap in a SimulatedClock; frame pacing, profiling and
+    save delays stay on real time. `rate` is clock seconds per real second, and
+    after() delays worked out in clock time are divided by it.
+    """
+    rate = 1.0
+
+    def time(self): return time.time()
+    def monotonic(self): return time.monotonic()
+    def today(self): return datetime.date.fromtimestamp(self.time())
+
+class SimulatedClock(Clock):
+    """Virtual time starting at `start` (epoch seconds). With a `rate` it runs that many
+    times faster than real time; without one it stands still until advance_to()."""
+    def __init__(self, start, rate=None):
+        self.start = self._now = start; self.running = rate is not None
+        self.rate = rate or 1.0; self._real_start = time.monotonic()
+
+    def time(self):
+        return self.start + (time.monotonic() - self._real_start) * self.rate if self.running else self._now
+
+    def monotonic(self): return self.time() - self.start
+    def advance_to(self, t): self._now = max(self._now, t)
+
+CLOCK = Clock()
+
+# --- Files ---
+def atomic_write(path, text, prefix=".daytracker_"):
+    """Writes `text` to a temp file next to `path` and renames it over `path`, so readers
+    never see a half-written file; an existing file keeps its mode. Raises OSError."""
+    import tempfile
+    fd, tmp_path = tempfile.mkstemp(prefix=prefix, suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        try: os.fchmod(fd, os.stat(path).st_mode & 0o7777) # mkstemp() creates it 0600
+        except FileNotFoundError: pass
+        with os.fdopen(fd, 'w') as f:
+            f.write(text); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
 
 # --- Configuration Management ---
 class ConfigManager:
@@ -53,36 +183,126 @@ class ConfigManager:
                 "ring_width": 12,
                 "bar_color_1": "#FF4500",
                 "bar_color_2": "#FFD700",
-                "background_color": "#444444"
+                "background_color": "#444444",
+                "segments": 0 # 0 = pick a segment count from the ring size
             }
         },
         "behavior": {
             "update_interval_seconds": 5, "display_mode": "Percentage",
             "day_definition_mode": "Start Time & Duration", "duration_hours": 8.0,
-            "show_text_label": True,
+            "show_text_label": True, "animation_fps": 30, # 0 = no animation
             "auto_position": False, # New: Auto-position to left of screen
+            "timer_dock": False, # Show all timers in one window instead of one window each
+            "control_socket": False, # Accept commands on a local socket (same as --control)
+            "snap_distance": 10, # px within which dragged windows snap to screen edges and each other; 0 = off
+            "timers_follow_bar": False # Dragging the main bar moves the timer windows with it
+        },
+        "bars": [], # Extra bars, each a dict of keys overriding this config, e.g. [{"start_time": "13:00", "geometry": {"x": 170}}]
+        "schedule": {
+            "intervals": [], # [["09:00", "12:30"], ...]; empty = one span from start_time and end_time/duration
+            "breaks": [], # Planned breaks cut out of the intervals, e.g. [["12:00", "12:30"]]
+            "weekdays": {} # Per-day overrides, e.g. {"fri": {"intervals": [["09:00", "13:00"]]}, "sun": {"intervals": []}}
         }
     }
     CONFIG_FILE = "adv_tracker_config.json"
+    SAVE_DELAY = 0.5 # seconds; saves requested within this window are written once
 
     def __init__(self):
+        self.version = 0; self._settings = None
+        self._known_mtime = None; self.save_error = None
+        self._pending_text = None; self._save_due = 0
+        self._save_cond = self._write_lock = self._writer = None # Created by the first save
         self.config = self.load_config()
 
+    @property
+    def config(self): return self._config
+
+    @config.setter
+    def config(self, value):
+        self._config = value; self._changed()
+
+    def _changed(self):
+        self.version += 1; self._settings = None
+
+    @property
+    def settings(self):
+        """Typed snapshot of the current config, rebuilt only after it changes."""
+        if self._settings is None: self._settings = Settings(self)
+        return self._settings
+
     def load_config(self):
         if os.path.exists(self.CONFIG_FILE):
-            try:
-                with open(self.CONFIG_FILE, 'r') as f:
-                    loaded_config = json.load(f)
-                    # Deep merge ensures new default settings are added if config file is old
-                    return self._deep_merge_dicts(copy.deepcopy(self.DEFAULT_CONFIG), loaded_config)
-            except (json.JSONDecodeError, IOError): pass
-        return copy.deepcopy(self.DEFAULT_CONFIG)
-
+            try: return self._read_config_file()
+            except (json.JSONDecodeError, IOError, AttributeError): pass
+        return self._deep_merge_dicts({}, self.DEFAULT_CONFIG)
+
+    def _read_config_file(self):
+        self._known_mtime = os.stat(self.CONFIG_FILE).st_mtime_ns
+        with open(self.CONFIG_FILE, 'r') as f:
+            loaded_config = json.load(f)
+        # Deep merge ensures new default settings are added if config file is old
+        return self._deep_merge_dicts(self._deep_merge_dicts({}, self.DEFAULT_CONFIG), loaded_config)
+
+    @profiled("save_config")
     def save_config(self):
+        """Queues the current config for writing; the write itself happens off the UI thread."""
+        text = json.dumps(self.config, indent=4)
+        if self._writer is None:
+            import threading
+            self._save_cond = threading.Condition(); self._write_lock = threading.Lock()
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+        with self._save_cond:
+            self._pending_text = text
+            self._save_due = time.monotonic() + self.SAVE_DELAY
+            self._save_cond.notify()
+
+    def flush(self):
+        """Writes any pending save right away, or waits for the one in progress (used on exit)."""
+        if self._writer is None: return
+        self._write_pending()
+
+    def _writer_loop(self):
+        while True:
+            with self._save_cond:
+                while self._pending_text is None: self._save_cond.wait()
+                delay = self._save_due - time.monotonic()
+                if delay > 0:
+                    self._save_cond.wait(delay); continue # Another save may push the deadline back
+            self._write_pending()
+
+    def _write_pending(self):
+        # The lock is held from taking the text until it is on disk, so flush() can't return mid-write
+        with self._write_lock:
+            with self._save_cond:
+                text, self._pending_text = self._pending_text, None
+            if text is not None: self._write_file(text)
+
+    @profiled("config_write")
+    def _write_file(self, text):
+        # Atomic, so readers (including our own hot reload) never see a half-written file
         try:
-            with open(self.CONFIG_FILE, 'w') as f: json.dump(self.config, f, indent=4)
-        except IOError as e:
-            messagebox.showerror("Config Error", f"Could not save configuration file:\n{e}")
+            atomic_write(self.CONFIG_FILE, text, prefix=".adv_tracker_")
+            self._known_mtime = os.stat(self.CONFIG_FILE).st_mtime_ns
+        except OSError as e:
+            self.save_error = e
+
+    def reload_if_changed(self, force=False):
+        """Loads the config file again if something else modified it (or always, with `force`);
+        returns True if the config changed."""
+        if self._pending_text is not None or (self._write_lock and self._write_lock.locked()): return False
+        try: mtime = os.stat(self.CONFIG_FILE).st_mtime_ns
+        except OSError: return False
+        if mtime == self._known_mtime and not force: return False
+        try: loaded = self._read_config_file()
+        except (json.JSONDecodeError, IOError, AttributeError): return False # Keep the running config
+        if loaded == self.config: return False
+        self.config = loaded
+        return True
+
+    def pop_save_error(self):
+        error, self.save_error = self.save_error, None
+        return error
 
     def get(self, key_path):
         keys = key_path.split('.'); value = self.config
@@ -90,238 +310,1759 @@ class ConfigManager:
             for key in keys: value = value[key]
             return value
         except KeyError: # Return default if key doesn't exist (e.g., old config file)
-             keys = key_path.split('.'); value = self.DEFAULT_CONFIG
-             for key in keys: value = value[key]
-             return value
+             return self.get_default(key_path)
+
+    @staticmethod
+    def categorize(key_path):
+        """Which part of the UI a key affects: 'geometry', 'window', 'colors' or 'behavior'."""
+        if key_path.startswith('geometry.') or key_path == 'behavior.auto_position': return 'geometry'
+        if key_path == 'appearance.opacity': return 'window'
+        if key_path.startswith('appearance.'): return 'colors'
+        return 'behavior'
+
+    def get_default(self, key_path):
+        value = self.DEFAULT_CONFIG
+        for key in key_path.split('.'): value = value[key]
+        return value
 
 
     def set(self, key_path, value):
         keys = key_path.split('.'); d = self.config
         for key in keys[:-1]: d = d.setdefault(key, {})
         d[keys[-1]] = value
+        self._changed()
     
     def _deep_merge_dicts(self, base, new):
         for key, value in new.items():
-            if isinstance(value, dict) and key in base and isinstance(base[key], dict):
-                base[key] = self._deep_merge_dicts(base[key], value)
+            if isinstance(value, dict):
+                # Nested dicts and lists are always copied, so the result never aliases DEFAULT_CONFIG
+                base[key] = self._deep_merge_dicts(base[key] if isinstance(base.get(key), dict) else {}, value)
+            elif isinstance(value, list):
+                import copy
+                base[key] = copy.deepcopy(value) # e.g. "bars", whose entries BarConfig edits
             else: base[key] = value
         return base
 
-# --- Main Application ---
-class TimeProgressBar(tk.Tk):
+def parse_hhmm(text):
+    """'HH:MM' as minutes after midnight; raises ValueError for anything else."""
+    parts = str(text).split(':')
+    if len(parts) != 2: raise ValueError(f"expected HH:MM, got {text!r}")
+    h, m = int(parts[0]), int(parts[1])
+    if not (0 <= h <= 23 and 0 <= m <= 59): raise ValueError(f"expected HH:MM, got {text!r}")
+    return h * 60 + m
+
+def hhmm(text):
+    """Settings converter: `text` as a normalised 'HH:MM'; raises ValueError."""
+    minutes = parse_hhmm(text)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def parse_spans(spans):
+    """[["HH:MM", "HH:MM"], ...] as (start, end) minute pairs. Malformed spans are skipped;
+    None if `spans` isn't a list, or if it held spans and none of them were usable."""
+    if not isinstance(spans, (list, tuple)): return None
+    parsed = []
+    for span in spans:
+        try:
+            start, end = span
+            parsed.append((parse_hhmm(start), parse_hhmm(end)))
+        except (TypeError, ValueError): continue
+    return parsed if parsed or not spans else None
+
+def parse_schedule(schedule):
+    """Settings converter for the hand-edited "schedule" section: every span parsed to minutes,
+    unusable parts dropped (so the day falls back to what they'd override). Raises ValueError
+    only when the section isn't an object at all."""
+    if not isinstance(schedule, dict): raise ValueError("schedule must be an object")
+    def spans_of(section):
+        parsed = {}
+        for key in ('intervals', 'breaks'):
+            spans = parse_spans(section[key]) if key in section else None
+            if spans is not None: parsed[key] = spans
+        return parsed
+    weekdays = schedule.get('weekdays')
+    parsed = spans_of(schedule)
+    parsed['weekdays'] = {day: spans_of(section) for day, section in weekdays.items()
+                          if day in WEEKDAYS and isinstance(section, dict)} if isinstance(weekdays, dict) else {}
+    return parsed
+
+class Settings:
+    """Flat, typed snapshot of the merged config for the hot paths.
+
+    Renderers and the update loop read plain attributes from it instead of walking
+    dotted key paths; `version` matches ConfigManager.version when it was built.
+    """
+    FIELDS = (
+        ('start_time', 'start_time', hhmm), ('end_time', 'end_time', hhmm),
+        ('width', 'geometry.width', int), ('height', 'geometry.height', int),
+        ('x', 'geometry.x', int), ('y', 'geometry.y', int),
+        ('bar_color_1', 'appearance.bar_color_1', str), ('bar_color_2', 'appearance.bar_color_2', str),
+        ('background_color', 'appearance.background_color', str), ('text_color', 'appearance.text_color', str),
+        ('completed_color', 'appearance.completed_color', str), ('opacity', 'appearance.opacity', float),
+        ('corner_radius', 'appearance.corner_radius', int), ('theme', 'appearance.theme', str),
+        ('timer_ring_width', 'appearance.timer.ring_width', int),
+        ('timer_bar_color_1', 'appearance.timer.bar_color_1', str), ('timer_bar_color_2', 'appearance.timer.bar_color_2', str),
+        ('timer_background_color', 'appearance.timer.background_color', str),
+        ('timer_segments', 'appearance.timer.segments', int),
+        ('update_interval_seconds', 'behavior.update_interval_seconds', float),
+        ('display_mode', 'behavior.display_mode', str), ('day_definition_mode', 'behavior.day_definition_mode', str),
+        ('duration_hours', 'behavior.duration_hours', float), ('show_text_label', 'behavior.show_text_label', bool),
+        ('auto_position', 'behavior.auto_position', bool), ('animation_fps', 'behavior.animation_fps', int),
+        ('timer_dock', 'behavior.timer_dock', bool), ('control_socket', 'behavior.control_socket', bool),
+        ('snap_distance', 'behavior.snap_distance', int), ('timers_follow_bar', 'behavior.timers_follow_bar', bool),
+        ('schedule', 'schedule', parse_schedule),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS) + ('version',)
+
     def __init__(self, config_manager):
-        super().__init__()
+        self.version = config_manager.version
+        for name, key_path, kind in self.FIELDS:
+            try: value = self._convert(kind, config_manager.get(key_path))
+            except (TypeError, ValueError, KeyError): # Fall back to the default for unusable values
+                value = self._convert(kind, config_manager.get_default(key_path))
+            setattr(self, name, value)
+
+    @staticmethod
+    def _convert(kind, value):
+        return kind(float(value)) if kind is int else kind(value)
+
+class BarConfig:
+    """One extra bar's view of the shared config: `config["bars"][index]` overrides the main bar's keys.
+
+    Same interface as ConfigManager, so a bar, its schedule and its Settings can't
+    tell them apart. The config is parsed once and shared; each bar only caches its
+    own Settings snapshot, rebuilt when the shared `version` moves.
+    """
+    GAP = 10 # px between a bar and the one before it, when no x is configured
+
+    def __init__(self, config_manager, index):
+        self.manager = config_manager; self.index = index
+        self.THEMES = config_manager.THEMES; self.categorize = config_manager.categorize
+        self._settings = None
+
+    @property
+    def version(self): return self.manager.version
+
+    @property
+    def overrides(self):
+        bars = self.manager.config.get("bars")
+        bar = bars[self.index] if isinstance(bars, list) and self.index < len(bars) else None
+        return bar if isinstance(bar, dict) else {}
+
+    @property
+    def settings(self):
+        if self._settings is None or self._settings.version != self.manager.version: self._settings = Settings(self)
+        return self._settings
+
+    def get(self, key_path):
+        value = self.overrides
+        try:
+            for key in key_path.split('.'): value = value[key]
+            return value
+        except (KeyError, TypeError):
+            if key_path == 'geometry.x': # Line up beside the bars before this one
+                return self.manager.settings.x + (self.index + 1) * (self.manager.settings.width + self.GAP)
+            return self.manager.get(key_path)
+
+    def get_default(self, key_path): return self.manager.get_default(key_path)
+
+    def set(self, key_path, value):
+        keys = key_path.split('.'); d = self.overrides
+        for key in keys[:-1]: d = d.setdefault(key, {})
+        d[keys[-1]] = value
+        self.manager._changed()
+
+    def save_config(self): self.manager.save_config()
+
+# --- Day Schedule ---
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+class DaySchedule:
+    """The current workday as sorted work intervals, computed once and reused until it can change.
+
+    Times are epoch seconds. Planned breaks are cut out of the intervals, and a prefix
+    sum of interval lengths makes "work done by t" a bisect plus arithmetic. Ad-hoc
+    breaks don't count as work, so they push the end of the day back. The cache is
+    rebuilt when the day rolls over (midnight or the next start time) or when one
+    of the config keys the schedule depends on changes.
+    """
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self._version = None; self._key = None; self.valid_until = 0.0
+        self.start_of_day = self.end_of_day = None
+        self.start = self.end = self.next_start = 0.0
+        self.total_seconds = 0.0; self._end_minute = None
+        self.end_time = self.end_label = "" # Projected end as "HH:MM", and as the bar shows it
+        self.intervals = []; self._starts = []; self._cum = [] # _cum[i]: work seconds before intervals[i]
+        self.breaks = [] # Ad-hoc breaks as [start, end]; end is None while the break is running
+
+    def refresh(self, now=None):
+        """Brings the cached schedule up to date for `now` (epoch seconds) and returns self."""
+        if now is None: now = CLOCK.time()
+        cfg = self.config_manager.settings
+        if cfg.version != self._version:
+            key = (cfg.start_time, cfg.end_time, cfg.day_definition_mode, cfg.duration_hours, cfg.schedule)
+            if key != self._key: self.valid_until = 0.0 # Force a rebuild below
+            self._version = cfg.version
+        else:
+            key = self._key
+        if now >= self.valid_until: self._compute(now, cfg, key)
+        end_minute = int(self.projected_end(now) // 60)
+        if end_minute != self._end_minute: # Ad-hoc breaks move the end of the day
+            self._end_minute = end_minute
+            self.end_time = datetime.datetime.fromtimestamp(end_minute * 60).strftime('%H:%M')
+            self.end_label = f"Ends {self.end_time}"
+        return self
+
+    # Work time
+    def scheduled_work(self, t):
+        """Scheduled work seconds done by `t`; past the last interval every second counts (overtime)."""
+        i = bisect_right(self._starts, t) - 1
+        if i < 0: return 0.0
+        s, e = self.intervals[i]
+        if t <= e or i < len(self.intervals) - 1: return self._cum[i] + min(t, e) - s
+        return self._cum[i] + t - s
+
+    def time_at_work(self, work):
+        """Inverse of scheduled_work(): the moment `work` scheduled seconds have been done."""
+        if not self.intervals: return self.start
+        i = max(0, bisect_right(self._cum, work) - 1)
+        return self.intervals[i][0] + work - self._cum[i]
+
+    def break_seconds(self, t):
+        """Work seconds lost to ad-hoc breaks by `t`."""
+        lost = 0.0
+        for a, b in self.breaks:
+            if a >= t: continue
+            lost += self.scheduled_work(t if b is None else min(b, t)) - self.scheduled_work(a)
+        return lost
+
+    def remaining(self, t):
+        """Work seconds left at `t` (negative once the day is over)."""
+        return self.total_seconds - self.scheduled_work(t) + self.break_seconds(t)
+
+    def projected_end(self, t):
+        """When the work left at `t` runs out if there are no further ad-hoc breaks."""
+        return self.time_at_work(self.scheduled_work(t) + self.remaining(t))
+
+    def rate_change(self, t):
+        """(working, seconds until that changes) at `t`."""
+        if self.on_break: return False, math.inf # Until the break is ended
+        i = bisect_right(self._starts, t) - 1
+        if i < 0: return False, (self._starts[0] - t) if self._starts else math.inf
+        if i == len(self.intervals) - 1: return True, math.inf # The last interval runs on as overtime
+        s, e = self.intervals[i]
+        return (True, e - t) if t < e else (False, self._starts[i + 1] - t)
+
+    # Ad-hoc breaks
+    @property
+    def on_break(self): return bool(self.breaks) and self.breaks[-1][1] is None
+
+    def start_break(self, t):
+        if not self.on_break: self.breaks.append([t, None])
+
+    def end_break(self, t):
+        """Ends the running break; returns when it started, or None if there wasn't one."""
+        if not self.on_break: return None
+        self.breaks[-1][1] = t
+        return self.breaks[-1][0]
+
+    def set_breaks(self, spans):
+        """Replaces the finished ad-hoc breaks (e.g. with the journal's after a restart)."""
+        running = [self.breaks[-1]] if self.on_break else []
+        self.breaks = sorted([a, b] for a, b in spans) + running
+
+    # Building the intervals
+    def _spans_for(self, date, cfg):
+        """Work spans for `date` as sorted, merged (start, end) epoch pairs, planned breaks cut out."""
+        sched = cfg.schedule # Already parsed to minute pairs by parse_schedule()
+        day = sched['weekdays'].get(WEEKDAYS[date.weekday()], {})
+        if 'intervals' in day: spans = day['intervals'] # An empty list makes it a day off
+        elif sched.get('intervals'): spans = sched['intervals']
+        else: # Single span from the classic start/end or start/duration settings
+            start = parse_hhmm(cfg.start_time)
+            if cfg.day_definition_mode == "Start Time & Duration": end = start + cfg.duration_hours * 60
+            else: end = parse_hhmm(cfg.end_time)
+            spans = [(start, end)]
+        if not spans: return []
+
+        # A span ending at or before its start runs past midnight, and so do spans starting before
+        # the day's first one. The first is whichever start makes the day shortest, so the order
+        # spans are listed in doesn't matter and a night shift split at midnight stays one day.
+        def place(start, end, anchor):
+            if start < anchor: start += 1440
+            while end <= start: end += 1440
+            return start, end
+        anchor = min(sorted({s for s, _ in spans}), key=lambda a: max(place(s, e, a)[1] for s, e in spans) - a)
+        merged = []
+        for s, e in sorted(place(s, e, anchor) for s, e in spans):
+            if merged and s <= merged[-1][1]: merged[-1][1] = max(merged[-1][1], e)
+            else: merged.append([s, e])
+        for brk in day.get('breaks', sched.get('breaks', [])):
+            cut_s, cut_e = place(*brk, anchor)
+            kept = []
+            for s, e in merged:
+                if cut_e <= s or cut_s >= e: kept.append([s, e]); continue
+                if s < cut_s: kept.append([s, cut_s])
+                if cut_e < e: kept.append([cut_e, e])
+            merged = kept
+        base = datetime.datetime.combine(date, datetime.time())
+        return [((base + datetime.timedelta(minutes=s)).timestamp(), (base + datetime.timedelta(minutes=e)).timestamp())
+                for s, e in merged]
+
+    def _compute(self, now_ts, cfg, key):
+        now = datetime.datetime.fromtimestamp(now_ts)
+        one_day = datetime.timedelta(days=1)
+        day = now.date(); intervals = self._spans_for(day, cfg)
+        # If 'now' is before today's workday started (or today is off), look at yesterday's workday
+        if not intervals or now_ts < intervals[0][0]:
+            yesterday = self._spans_for(day - one_day, cfg)
+            if yesterday: day, intervals = day - one_day, yesterday
+            else: intervals = []
+
+        self.intervals = intervals
+        self._starts = [s for s, _ in intervals]
+        self._cum = []; total = 0.0
+        for s, e in intervals: self._cum.append(total); total += e - s
+        self.total_seconds = total
+        midnight = datetime.datetime.combine(now.date() + one_day, datetime.time()).timestamp()
+        if intervals: self.start, self.end = intervals[0][0], intervals[-1][1]
+        else: self.start = self.end = datetime.datetime.combine(now.date(), datetime.time()).timestamp() # Day off
+        self.start_of_day = datetime.datetime.fromtimestamp(self.start)
+        self.end_of_day = datetime.datetime.fromtimestamp(self.end)
+
+        self.next_start = midnight
+        for offset in range(8): # From 0: after a day off, `day` is still today
+            upcoming = self._spans_for(day + offset * one_day, cfg)
+            if upcoming and upcoming[0][0] > now_ts: self.next_start = upcoming[0][0]; break
+        self.breaks = [b for b in self.breaks if b[1] is None or b[1] > self.start]
+        self.valid_until = min(self.next_start, midnight)
+        self._end_minute = None
+        self._key = key
+
+# --- Journal ---
+class Journal:
+    """Append-only record of what actually happened: workdays, breaks and timers.
+
+    Records are compact JSON lines in JOURNAL_FILE. INDEX_FILE gets a "<day> <offset>"
+    line whenever the local day of the appended records changes, so a query over a
+    few days reads only those byte ranges. record() just queues; a background
+    thread appends the queue in batches.
+    """
+    JOURNAL_FILE = "daytracker_journal.log"
+    INDEX_FILE = "daytracker_journal.idx"
+    FLUSH_DELAY = 1.0 # seconds
+
+    def __init__(self):
+        import threading
+        self._pending = []; self._cond = threading.Condition(); self._io_lock = threading.Lock()
+        self._writer = None
+        self._index = None # [(day, offset), ...] in file order, loaded on first use
+        self.write_error = None
+
+    def record(self, event, when=None, **fields):
+        rec = {"t": round(CLOCK.time() if when is None else when, 3), "e": event}
+        rec.update(fields)
+        with self._cond:
+            self._pending.append(rec)
+            if self._writer is None:
+                import threading
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Appends everything queued so far right away (used on exit)."""
+        with self._io_lock: self._append_pending()
+
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending: self._cond.wait()
+            time.sleep(self.FLUSH_DELAY) # Let a burst of records share one write
+            with self._io_lock: self._append_pending()
+
+    def _load_index(self):
+        self._index = []
+        try:
+            with open(self.INDEX_FILE, 'r') as f:
+                for line in f:
+                    day, _, offset = line.strip().partition(' ')
+                    if offset.isdigit(): self._index.append((day, int(offset)))
+        except IOError: pass
+
+    @profiled("journal_write")
+    def _append_pending(self):
+        # Caller holds _io_lock
+        with self._cond:
+            records, self._pending = self._pending, []
+        if not records: return
+        if self._index is None: self._load_index()
+        last_day = self._index[-1][0] if self._index else None
+        new_entries = []
+        try:
+            with open(self.JOURNAL_FILE, 'ab') as f:
+                offset = f.tell()
+                for rec in records:
+                    day = datetime.date.fromtimestamp(rec["t"]).isoformat()
+                    if day != last_day:
+                        new_entries.append((day, offset)); last_day = day
+                    data = (json.dumps(rec, separators=(',', ':')) + "\n").encode('utf-8')
+                    f.write(data); offset += len(data)
+            if new_entries:
+                with open(self.INDEX_FILE, 'a') as f:
+                    f.write("".join(f"{day} {offset}\n" for day, offset in new_entries))
+                self._index.extend(new_entries)
+        except IOError as e:
+            self.write_error = e
+
+    def records(self, first_day, last_day, event=None):
+        """Records from local days first_day..last_day (datetime.date, inclusive), oldest first."""
+        first, last = first_day.isoformat(), last_day.isoformat()
+        result = []
+        with self._io_lock: # Only a snapshot is taken under the lock, so appends never wait for the read
+            if self._index is None: self._load_index()
+            index = list(self._index)
+            with self._cond: pending = list(self._pending)
+            try: size = os.path.getsize(self.JOURNAL_FILE) # Bytes appended later were in `pending`
+            except OSError: size = 0
+        ranges = [(offset, index[i + 1][1] if i + 1 < len(index) else size)
+                  for i, (day, offset) in enumerate(index) if first <= day <= last]
+        try:
+            with open(self.JOURNAL_FILE, 'rb') as f:
+                for offset, end in ranges:
+                    f.seek(offset)
+                    for line in f.read(end - offset).splitlines():
+                        try: result.append(json.loads(line))
+                        except ValueError: pass # Skip a torn line
+        except IOError: pass
+        for rec in pending:
+            if first <= datetime.date.fromtimestamp(rec["t"]).isoformat() <= last: result.append(rec)
+        if event is not None: result = [r for r in result if r.get("e") == event]
+        return result
+
+    def breaks(self, first_day, last_day, since):
+        """Ad-hoc breaks after `since`: ([(start, end), ...], start of a break still running or None)."""
+        spans = []; running = None
+        for r in self.records(first_day, last_day):
+            if r["t"] <= since: continue
+            if r.get("e") == "break_start": running = r["t"]
+            elif r.get("e") == "break_end": spans.append((r["t"] - r.get("seconds", 0), r["t"])); running = None
+        return spans, running
+
+    def break_seconds(self, first_day, last_day):
+        return sum(r.get("seconds", 0) for r in self.records(first_day, last_day, "break_end"))
+
+    def timers_completed(self, first_day, last_day):
+        return len(self.records(first_day, last_day, "timer_finish"))
+
+# --- Headless Status ---
+# What the bar shows and when that next changes, as plain functions shared by the
+# bar and the Tk-free --status/--watch entry points.
+STATUS_MAX_SLEEP = 60 # seconds; --watch also picks up config edits and breaks at least this often
+
+def seconds_until_step(remaining, step, offset=0.0):
+    """Seconds until a countdown at `remaining` next crosses a value (k + offset) * step."""
+    if step <= 0: return math.inf
+    phase = (remaining / step - offset) % 1.0
+    return (phase or 1.0) * step
+
+def next_change_delay(remaining, steps, until_next_day, working=True, until_rate_change=math.inf,
+                      moving_end=False, floor=0.0, cap=300):
+    """Seconds until a workday countdown would render differently.
+
+    `steps` are (step, offset) pairs: the rendering changes whenever `remaining`
+    crosses (k + offset) * step. Outside work intervals nothing moves until
+    `until_rate_change`, except a projected end that slips during an ad-hoc break
+    (`moving_end`). The result is clamped to [floor, cap].
+    """
+    if remaining <= 0: # "Done" until the next workday starts
+        candidates = [until_next_day]
+    elif not working:
+        candidates = [until_rate_change, 60 if moving_end else math.inf]
+    else:
+        candidates = [until_rate_change, remaining] + [seconds_until_step(remaining, step, offset) for step, offset in steps]
+    return min(max(min(candidates), floor), cap) + 0.001 # Land just past the boundary
+
+def visible_steps(cfg, total, h):
+    """(step, offset) pairs for next_change_delay(): when an `h` px bar over `total` work
+    seconds, and its label, render differently."""
+    steps = [(total / h, 0.0)] # One pixel row of the bar
+    if cfg.show_text_label:
+        if cfg.display_mode == "Percentage": steps.append((total / 100, 0.5))
+        elif cfg.display_mode == "Time Remaining": steps.append((60, 0.0))
+    return steps
+
+def bar_progress(day, now):
+    """(total, remaining, percentage) for the bar at `now`; it shows the share of work time left."""
+    total = day.total_seconds if day.total_seconds > 0 else 1
+    remaining = day.remaining(now) # Working time only
+    return total, remaining, max(0, min(100, remaining / total * 100))
+
+def bar_colors(cfg, remaining):
+    """The bar's gradient (top, bottom); a finished day is drawn in the completed color."""
+    return (cfg.bar_color_1, cfg.bar_color_2) if remaining > 0 else (cfg.completed_color,) * 2
+
+def end_label_moves(cfg, on_break):
+    """Whether the label shows a projected end that slips while an ad-hoc break runs."""
+    return cfg.show_text_label and cfg.display_mode == "End Time" and on_break
+
+def label_text(mode, remaining, percentage, end_label):
+    """The bar's text for behavior.display_mode `mode`."""
+    # Since the bar shows remaining time, the text should be consistent
+    if remaining <= 0: return "Done"
+    if mode == "Time Remaining":
+        h, rem = divmod(remaining, 3600)
+        h, m = int(h), int(rem // 60)
+        return f"{h}h {m}m" if h > 0 else f"{m}m"
+    elif mode == "End Time":
+        return end_label
+    return f"{percentage:.0f}%" # Percentage mode
+
+def day_status(day, now, mode):
+    """The workday at `now` as a dict; "text", "tooltip", "percentage" and "class" are what Waybar expects."""
+    _, remaining, percentage = bar_progress(day, now)
+    left = label_text("Time Remaining", remaining, percentage, day.end_label)
+    if remaining <= 0: state = "done"
+    elif day.on_break: state = "break"
+    else: state = "working" if day.rate_change(now)[0] else "planned_break"
+    return {"text": label_text(mode, remaining, percentage, day.end_label),
+            "tooltip": f"{left} left, {day.end_label.lower()}" if remaining > 0 else "Done",
+            "percentage": round(percentage), "remaining": left, "end": day.end_time, "class": state}
+
+def status_main(argv):
+    """--status prints the bar's state once as a JSON line; --watch keeps running and prints
+    a line only when it changes, sleeping until the next change in between."""
+    config = ConfigManager(); schedule = DaySchedule(config)
+    watch = "--watch" in argv; last = None
+    try:
+        while True:
+            if watch: config.reload_if_changed()
+            now = CLOCK.time()
+            day = schedule.refresh(now)
+            # Ad-hoc breaks live in the journal the bar writes; re-read it so --watch sees new ones
+            first = day.start_of_day.date()
+            spans, running = Journal().breaks(first, datetime.date.fromtimestamp(now), day.start)
+            day.breaks = []; day.set_breaks(spans)
+            if running is not None: day.start_break(running)
+            day.refresh(now) # The projected end depends on the breaks
+
+            status = day_status(day, now, config.settings.display_mode)
+            if status != last:
+                print(json.dumps(status), flush=True); last = status
+            if not watch: return 0
+            total = day.total_seconds if day.total_seconds > 0 else 1
+            time.sleep(next_change_delay(day.remaining(now), [(total / 100, 0.5), (60, 0.0)], day.next_start - now,
+                                         *day.rate_change(now), moving_end=day.on_break, cap=STATUS_MAX_SLEEP))
+    except (KeyboardInterrupt, BrokenPipeError): # Ctrl-C, or the status bar went away
+        return 0
+
+def control_socket_path():
+    """Where a running tracker listens for control commands (see ControlServer)."""
+    import tempfile
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"daytracker-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+def send_main(argv):
+    """--send '<json>' sends one command to the running tracker and prints its reply."""
+    import socket
+    try: command = argv[argv.index("--send") + 1]
+    except IndexError:
+        print('usage: daytracker.py --send \'{"cmd": "state"}\'', file=sys.stderr); return 2
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(control_socket_path())
+            sock.sendall(command.encode() + b"\n")
+            reply = sock.makefile('rb').readline().decode()
+    except (OSError, AttributeError) as e: # AttributeError: no AF_UNIX on this platform
+        print(f"Could not reach DayTracker: {e}", file=sys.stderr); return 1
+    print(reply, end="")
+    return 0 if json.loads(reply or "{}").get("ok") else 1
+
+# Tk-free entry points run here, before tkinter is even imported
+if __name__ == "__main__" and "--send" in sys.argv[1:]:
+    sys.exit(send_main(sys.argv[1:]))
+if __name__ == "__main__" and ("--status" in sys.argv[1:] or "--watch" in sys.argv[1:]):
+    sys.exit(status_main(sys.argv[1:]))
+
+import tkinter as tk
+
+# --- Colors ---
+class Palette:
+    """Parsed colors and precomputed gradient lookup tables, shared by every scene.
+
+    Each color is parsed once to 8-bit (r, g, b). A gradient between two colors is a
+    table of SIZE ready-made hex strings, built once per color pair, so renderers
+    index into it instead of parsing and formatting a color per pixel row or ring
+    segment. Hex specs are parsed here; color names go through `resolve` (Tk's
+    winfo_rgb, 16-bit) once each. Unknown colors raise tk.TclError, like Tk does.
+    """
+    SIZE = 256
+
+    def __init__(self, resolve=None, maxsize=32):
+        self.resolve = resolve; self.maxsize = maxsize
+        self._rgb = {}; self._luts = OrderedDict()
+
+    def rgb(self, color):
+        rgb = self._rgb.get(color)
+        if rgb is None:
+            rgb = self._parse(color)
+            if len(self._rgb) >= 256: self._rgb.clear() # Color pickers can produce many one-off colors
+            self._rgb[color] = rgb
+        return rgb
+
+    def _parse(self, color):
+        digits = color[1:] if isinstance(color, str) and color.startswith('#') else None
+        if digits is not None and len(digits) in (3, 6, 9, 12):
+            n = len(digits) // 3
+            try: channels = [int(digits[i*n:(i+1)*n], 16) for i in range(3)]
+            except ValueError: channels = None
+            if channels is not None: return tuple(c * 17 if n == 1 else c >> (4 * n - 8) for c in channels)
+        if self.resolve is None or digits is not None: raise tk.TclError(f'unknown color name "{color}"')
+        return tuple(c >> 8 for c in self.resolve(color))
+
+    def lut(self, c1, c2):
+        """SIZE hex colors running from c1 to c2 (both included)."""
+        key = (c1, c2)
+        table = self._luts.get(key)
+        if table is not None:
+            self._luts.move_to_end(key)
+            return table
+        (r1, g1, b1), (r2, g2, b2) = self.rgb(c1), self.rgb(c2)
+        last = self.SIZE - 1
+        table = tuple(f'#{(r1*(last-i) + r2*i) // last:02x}{(g1*(last-i) + g2*i) // last:02x}{(b1*(last-i) + b2*i) // last:02x}'
+                      for i in range(self.SIZE))
+        self._luts[key] = table
+        while len(self._luts) > self.maxsize: self._luts.popitem(last=False)
+        return table
+
+    def steps(self, c1, c2, count):
+        """`count` evenly spaced colors starting at c1, stopping one step short of c2."""
+        table = self.lut(c1, c2)
+        return [table[i * self.SIZE // count] for i in range(count)]
+
+    def mix(self, c1, c2, t):
+        """The color `t` (0..1) of the way from c1 to c2."""
+        return self.lut(c1, c2)[round(max(0.0, min(1.0, t)) * (self.SIZE - 1))]
+
+PALETTE = Palette() # The main window plugs in Tk's color names as its resolver
+
+# --- Rendering ---
+# The scenes below only use this subset of the canvas API: create_polygon/line/image/
+# oval/arc/text, coords, itemconfig, tag_raise, delete, plus make_image. Colors come
+# from a Palette. TrackerCanvas provides it on top of Tk; RecordingCanvas counts it
+# without a display.
+class TrackerCanvas(tk.Canvas):
+    def make_image(self, width, height):
+        return tk.PhotoImage(master=self, width=width, height=height)
+
+class RecordingCanvas:
+    """Headless stand-in for TrackerCanvas that counts what a scene asks of Tk.
+
+    Nothing is drawn. `calls` counts every canvas call, and the item counters give
+    churn; call reset() between frames to measure one frame at a time.
+    """
+    def __init__(self):
+        self._next_id = 0; self.items = {}
+        self.reset()
+
+    def reset(self):
+        self.calls = 0; self.created = 0; self.deleted = 0; self.image_pixels = 0
+
+    def stats(self):
+        return {'calls': self.calls, 'created': self.created, 'deleted': self.deleted, 'image_pixels': self.image_pixels}
+
+    def _create(self, kind, *coords, **options):
+        self.calls += 1; self.created += 1; self._next_id += 1
+        self.items[self._next_id] = [kind, coords, options]
+        return self._next_id
+
+    def create_polygon(self, *coords, **options): return self._create('polygon', *coords, **options)
+    def create_line(self, *coords, **options): return self._create('line', *coords, **options)
+    def create_image(self, *coords, **options): return self._create('image', *coords, **options)
+    def create_oval(self, *coords, **options): return self._create('oval', *coords, **options)
+    def create_arc(self, *coords, **options): return self._create('arc', *coords, **options)
+    def create_text(self, *coords, **options): return self._create('text', *coords, **options)
+
+    def coords(self, item, *coords):
+        self.calls += 1; self.items[item][1] = coords
+
+    def itemconfig(self, item, **options):
+        self.calls += 1; self.items[item][2].update(options)
+
+    def tag_raise(self, tag): self.calls += 1
+
+    def delete(self, item):
+        self.calls += 1
+        if self.items.pop(item, None) is not None: self.deleted += 1
+
+    def make_image(self, width, height):
+        self.calls += 1
+        return RecordingImage(self)
+
+class RecordingImage:
+    def __init__(self, canvas): self.canvas = canvas
+
+    def put(self, data, to=None):
+        self.canvas.calls += 1
+        self.canvas.image_pixels += data.count('#')
+
+def rounded_rectangle_points(x1, y1, x2, y2, r):
+    return [x1+r, y1, x2-r, y1, x2, y1, x2, y1+r, x2, y2-r, x2, y2, x2-r, y2, x1+r, y2, x1, y2, x1, y2-r, x1, y1+r, x1, y1]
+
+class GradientCache:
+    """Pre-rendered vertical gradient images, keyed by (color1, color2, width, height).
+
+    Least recently used entries are evicted once more than `maxsize` are held, so a
+    theme or size change only builds the one image it needs. Row colors come from the
+    palette's lookup table, and each distinct row is formatted once.
+    """
+    def __init__(self, canvas, maxsize=8, palette=PALETTE):
+        self.canvas = canvas; self.maxsize = maxsize; self.palette = palette
+        self._images = OrderedDict()
+
+    def get(self, c1, c2, w, h):
+        key = (c1, c2, w, h)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+        image = self._render(c1, c2, w, h)
+        if image is None: return None
+        self._images[key] = image
+        while len(self._images) > self.maxsize: self._images.popitem(last=False)
+        return image
+
+    def _render(self, c1, c2, w, h):
+        if w <= 0 or h <= 0: return None
+        try: table = self.palette.steps(c1, c2, h)
+        except tk.TclError: return None
+        row_text = {}
+        for color in table:
+            if color not in row_text: row_text[color] = "{" + " ".join([color] * w) + "}"
+        image = self.canvas.make_image(w, h)
+        image.put(" ".join([row_text[color] for color in table]), to=(0, 0))
+        return image
+
+class BarScene:
+    """Retained canvas items for the progress bar.
+
+    Items are created once and then moved or recolored with coords/itemconfig,
+    and only when the value that drives them actually changed since the last frame.
+    Bars on the same Tk root can pass one shared `gradients` cache.
+    """
+    SEGMENT_COLOR = "#555555"
+
+    def __init__(self, canvas, gradients=None):
+        self.canvas = canvas
+        self.background = None; self.solid_bar = None
+        self.gradient_bar = None; self.gradient_image = None
+        self.gradients = gradients if gradients is not None else GradientCache(canvas)
+        self.segment_lines = []
+        self._state = {}
+
+    def _changed(self, key, value):
+        if self._state.get(key) == value: return False
+        self._state[key] = value
+        return True
+
+    @staticmethod
+    def bar_top(h, percentage):
+        """The bar (time remaining) is quantized to whole pixel rows."""
+        return int(h - h * (percentage / 100))
+
+    def render(self, w, h, r, bg_color, c1, c2, percentage, total_hours):
+        """Bring the scene up to date; a frame with nothing new makes no canvas calls."""
+        if self.background is None:
+            self.background = self.canvas.create_polygon(0, 0, 0, 0, smooth=True, joinstyle=tk.ROUND, tags="background")
+        if self._changed('background', (w, h, r)):
+            self.canvas.coords(self.background, rounded_rectangle_points(0, 0, w, h, r))
+        if self._changed('background_color', bg_color):
+            self.canvas.itemconfig(self.background, fill=bg_color)
+
+        y0 = self.bar_top(h, percentage)
+        if c1 == c2:
+            self._hide_gradient()
+            self._render_solid(w, h, r, y0, c1)
+        else:
+            self._hide_solid()
+            self._render_gradient(w, h, y0, c1, c2)
+
+        # Hourly segment lines sit on TOP of the bar
+        if self._changed('segments', (w, h, total_hours)):
+            self._render_segments(w, h, total_hours)
+
+    def _render_solid(self, w, h, r, y0, color):
+        if self.solid_bar is None:
+            self.solid_bar = self.canvas.create_polygon(0, 0, 0, 0, smooth=True, joinstyle=tk.ROUND, tags="bar")
+            self.canvas.tag_raise("segment")
+        if self._changed('solid', (w, h, r, y0)) and y0 < h:
+            self.canvas.coords(self.solid_bar, rounded_rectangle_points(0, y0, w, h, r))
+        self._set_visible(self.solid_bar, 'solid_visible', y0 < h)
+        if self._changed('solid_color', color):
+            self.canvas.itemconfig(self.solid_bar, fill=color)
+
+    def _hide_solid(self):
+        if self.solid_bar is not None: self._set_visible(self.solid_bar, 'solid_visible', False)
+
+    def _set_visible(self, item, key, visible):
+        if self._changed(key, visible):
+            self.canvas.itemconfig(item, state="normal" if visible else "hidden")
+
+    def _render_gradient(self, w, h, y0, c1, c2):
+        if self.gradient_bar is None:
+            self.gradient_bar = self.canvas.create_image(0, 0, anchor="nw", tags="bar")
+            self.canvas.tag_raise("segment")
+        if self._changed('gradient_image', (c1, c2, w, h)):
+            self.gradient_image = self.gradients.get(c1, c2, w, h)
+            self.canvas.itemconfig(self.gradient_bar, image=self.gradient_image or "")
+        # The full-height image slides down as the bar shrinks; the canvas clips what falls below it
+        if self._changed('gradient', y0) and y0 < h:
+            self.canvas.coords(self.gradient_bar, 0, y0)
+        self._set_visible(self.gradient_bar, 'gradient_visible', y0 < h)
+
+    def _hide_gradient(self):
+        if self.gradient_bar is not None: self._set_visible(self.gradient_bar, 'gradient_visible', False)
+
+    def _render_segments(self, w, h, total_hours):
+        count = total_hours - 1 if total_hours > 1 else 0
+        while len(self.segment_lines) < count:
+            # A faint line that contrasts with a dark background
+            self.segment_lines.append(self.canvas.create_line(0, 0, 0, 0, fill=self.SEGMENT_COLOR, width=1, tags="segment"))
+        while len(self.segment_lines) > count:
+            self.canvas.delete(self.segment_lines.pop())
+        segment_height = h / total_hours if count else 0
+        for i, line in enumerate(self.segment_lines, start=1):
+            y_pos = i * segment_height
+            self.canvas.coords(line, 0, y_pos, w, y_pos)
+
+class RingScene:
+    """Retained timer ring built from precomputed segment geometry and a color table.
+
+    The ring is only rebuilt when its layout or colors change; on each tick the
+    segments that expired since the previous tick are hidden and nothing else is touched.
+    """
+    MAX_SEGMENTS = 360
+
+    def __init__(self, canvas, palette=PALETTE):
+        self.canvas = canvas; self.palette = palette
+        self.track = None; self.segments = []
+        self.visible = 0
+        self._layout = None; self._colors = None; self._track_color = None
+
+    @classmethod
+    def segment_count(cls, radius, ring_width, requested=0):
+        """Number of dots in the ring; 0 picks just enough for neighbouring dots to overlap."""
+        if requested > 0: return min(int(requested), cls.MAX_SEGMENTS)
+        spacing = max(1.0, ring_width / 2)
+        return max(12, min(cls.MAX_SEGMENTS, int(2 * math.pi * radius / spacing)))
+
+    def render(self, w, h, ring_width, segments, bg_color, c1, c2, fraction, x0=0, y0=0):
+        """Draws the ring into the w x h box at (x0, y0)."""
+        half = ring_width // 2
+        if self.track is None:
+            self.track = self.canvas.create_arc(0, 0, 0, 0, start=0, extent=360, style=tk.ARC, tags="track")
+        radius = min(w, h)/2 - ring_width/2
+        count = self.segment_count(radius, ring_width, segments)
+        layout = (w, h, ring_width, count, x0, y0)
+        if layout != self._layout:
+            self.canvas.coords(self.track, x0 + half, y0 + half, x0 + w - half, y0 + h - half)
+            self.canvas.itemconfig(self.track, width=max(1, ring_width - 2))
+            self._build(x0 + w/2, y0 + h/2, radius, ring_width, count)
+            self._layout = layout; self._colors = None
+        if bg_color != self._track_color:
+            self._track_color = bg_color # Set first, so a color Tk rejects fails once rather than every tick
+            self.canvas.itemconfig(self.track, outline=bg_color)
+        if (c1, c2) != self._colors:
+            try: table = self.palette.steps(c1, c2, count)
+            except tk.TclError: table = None
+            if table:
+                for item, color in zip(self.segments, table): self.canvas.itemconfig(item, fill=color, outline=color)
+            self._colors = (c1, c2)
+
+        visible = max(0, min(count, int(count * fraction)))
+        if visible < self.visible:
+            for item in self.segments[visible:self.visible]: self.canvas.itemconfig(item, state="hidden")
+        elif visible > self.visible:
+            for item in self.segments[self.visible:visible]: self.canvas.itemconfig(item, state="normal")
+        self.visible = visible
+
+    def _build(self, cx, cy, radius, width, count):
+        for item in self.segments: self.canvas.delete(item)
+        d = width / 2; self.segments = []
+        for i in range(count):
+            rad = 2 * math.pi * i / count - math.pi / 2 # Start from top
+            x, y = cx + radius * math.cos(rad), cy + radius * math.sin(rad)
+            self.segments.append(self.canvas.create_oval(x-d, y-d, x+d, y+d, state="hidden", tags="segment"))
+        self.visible = 0
+
+    def clear(self):
+        """Deletes the ring's items (a ring leaving a shared canvas)."""
+        for item in self.segments: self.canvas.delete(item)
+        if self.track is not None: self.canvas.delete(self.track)
+        self.track = None; self.segments = []; self.visible = 0
+        self._layout = None; self._colors = None; self._track_color = None
+
+# --- Control Socket ---
+class ControlServer:
+    """Newline-delimited JSON commands on a Unix socket, for hotkey daemons and scripts.
+
+    An asyncio loop on a daemon thread accepts connections and queues each command
+    for the Tk thread, which a byte on a pipe wakes through createfilehandler, so
+    nothing polls. `handler` runs there against the app's in-memory state, and its
+    reply goes back to the client as one JSON line.
+    """
+    def __init__(self, widget, handler, path=None):
+        import asyncio, queue, threading
+        self.widget = widget; self.handler = handler
+        self.path = path or control_socket_path()
+        self.commands = queue.SimpleQueue(); self._empty = queue.Empty
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        widget.tk.createfilehandler(self._wake_r, tk.READABLE, self._drain)
+        self.loop = asyncio.new_event_loop(); self.server = None
+        self._ready = threading.Event(); self.error = None
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait(5)
+        if self.error is not None:
+            self.close(); raise self.error
+
+    def _run(self):
+        import asyncio, socket
+        asyncio.set_event_loop(self.loop)
+        try:
+            if os.path.exists(self.path):
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    try: probe.connect(self.path)
+                    except OSError: os.remove(self.path) # Left behind by a crash
+                    else: raise OSError(f"another DayTracker is already listening on {self.path}")
+            umask = os.umask(0o077) # Owner-only from the moment the socket exists, not just after the chmod
+            try: self.server = self.loop.run_until_complete(asyncio.start_unix_server(self._serve, path=self.path))
+            finally: os.umask(umask)
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            self.error = e
+        self._ready.set()
+        if self.error is None: self.loop.run_forever()
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                future = self.loop.create_future()
+                self.commands.put((line, future))
+                os.write(self._wake_w, b"!")
+                writer.write(await future)
+                await writer.drain()
+        except ConnectionError: pass
+        finally: writer.close()
+
+    def _drain(self, fd, mask):
+        """Tk thread: runs every queued command and hands each reply back to the asyncio thread."""
+        try: os.read(self._wake_r, 4096)
+        except BlockingIOError: pass
+        while True:
+            try: line, future = self.commands.get_nowait()
+            except self._empty: return
+            try: command = json.loads(line)
+            except ValueError: command = None
+            if not isinstance(command, dict): reply = {"ok": False, "error": "expected a JSON object per line"}
+            else:
+                try: reply = self.handler(command)
+                except Exception as e: reply = {"ok": False, "error": f"{type(e).__name__}: {e}"} # The client always gets a reply
+            data = (json.dumps(reply) + "\n").encode()
+            self.loop.call_soon_threadsafe(lambda f=future, d=data: f.done() or f.set_result(d))
+
+    def close(self):
+        self.widget.tk.deletefilehandler(self._wake_r)
+        if self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close); self.loop.call_soon_threadsafe(self.loop.stop)
+            try: os.remove(self.path)
+            except OSError: pass
+        for fd in (self._wake_r, self._wake_w): os.close(fd)
+
+# --- Power Mode ---
+def track_visibility(toplevel, canvas, callback):
+    """Keeps `toplevel.visible` up to date from <Map>/<Unmap> on the window and
+    <Visibility> on its canvas, and calls callback(visible) when it changes."""
+    toplevel.visible = True
+    def update(visible):
+        if visible != toplevel.visible:
+            toplevel.visible = visible; callback(visible)
+    toplevel.bind("<Map>", lambda e: update(True) if e.widget is toplevel else None, add="+")
+    toplevel.bind("<Unmap>", lambda e: update(False) if e.widget is toplevel else None, add="+")
+    canvas.bind("<Visibility>", lambda e: update(e.state != "VisibilityFullyObscured"), add="+")
+
+# --- Dragging ---
+class WindowDrag:
+    """Moves a window, and any followers with it, with the pointer; one geometry update per frame.
+
+    <B1-Motion> only records the pointer and a single after() per FRAME_MS applies
+    the latest position, so a high-rate mouse costs no more moves than the display
+    shows. The edges to snap to (the screen's and those of `others`) are collected
+    once, on press; `snap` is the snapping distance in px, 0 turns it off. Another
+    window's edge only counts while the two are level (or within `snap`) on the other axis.
+    `geometry` gives (x, y, w, h) for a window that isn't mapped yet.
+    """
+    FRAME_MS = 16
+
+    def __init__(self, window, e, snap=0, others=(), followers=(), geometry=None):
+        self.window = window; self.snap = snap
+        self.x0, self.y0, self.w, self.h = geometry or (window.winfo_x(), window.winfo_y(), window.winfo_width(), window.winfo_height())
+        self.mx, self.my = e.x_root, e.y_root
+        # (edge, start, end): the edge, and the span it covers along the other axis
+        self.x_edges = [(0, -math.inf, math.inf), (window.winfo_screenwidth(), -math.inf, math.inf)]
+        self.y_edges = [(0, -math.inf, math.inf), (window.winfo_screenheight(), -math.inf, math.inf)]
+        if snap:
+            for other in others:
+                x, y, w, h = other.winfo_x(), other.winfo_y(), other.winfo_width(), other.winfo_height()
+                self.x_edges += [(x, y, y + h), (x + w, y, y + h)]; self.y_edges += [(y, x, x + w), (y + h, x, x + w)]
+        self.followers = [(f, f.winfo_x() - self.x0, f.winfo_y() - self.y0) for f in followers]
+        self.pointer = None; self.job = None
+        self.placed = (self.x0, self.y0)
+
+    def motion(self, e):
+        self.pointer = (e.x_root, e.y_root)
+        if self.job is None: self.job = self.window.after(self.FRAME_MS, self._apply)
+
+    def _apply(self):
+        self.job = None
+        if self.pointer is None: return
+        x, y = self.x0 + self.pointer[0] - self.mx, self.y0 + self.pointer[1] - self.my
+        x, y = self._snapped(x, self.w, self.x_edges, y, self.h), self._snapped(y, self.h, self.y_edges, x, self.w)
+        if (x, y) == self.placed: return
+        self.placed = (x, y)
+        self.window.geometry(f"+{x}+{y}")
+        for follower, dx, dy in self.followers: follower.geometry(f"+{x + dx}+{y + dy}")
+
+    def _snapped(self, pos, size, edges, across, across_size):
+        """`pos` moved onto the nearest edge within `snap` px, by either side of the window;
+        `across`/`across_size` place the window on the other axis."""
+        best = pos; distance = self.snap + 1
+        for edge, start, end in edges:
+            if across > end + self.snap or across + across_size < start - self.snap: continue # Not level with it
+            for candidate in (edge, edge - size):
+                if abs(candidate - pos) < distance: best, distance = candidate, abs(candidate - pos)
+        return best
+
+    def finish(self):
+        """Applies a pending move right away; returns where the window ended up."""
+        if self.job is not None: self.window.after_cancel(self.job); self._apply()
+        return self.placed
+
+# --- Update Scheduling ---
+class TickScheduler:
+    """One after() chain for every bar's update tick.
+
+    Each bar asks to be woken at its own next visible change; the chain is armed for
+    the earliest of them, and bars due within COALESCE of it tick in the same wakeup,
+    so wakeups follow visible changes rather than the number of bars.
+    """
+    COALESCE = 0.05 # seconds
+    RETRY = 60 # seconds until a bar whose tick raised is tried again
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.due = {} # bar -> CLOCK.monotonic() it wants its next tick
+        self.job = None; self._armed_for = None
+        self.wakeups = 0
+
+    def schedule(self, bar, delay_seconds):
+        self.due[bar] = CLOCK.monotonic() + delay_seconds; self._arm()
+
+    def cancel(self, bar):
+        if self.due.pop(bar, None) is not None: self._arm()
+
+    def _arm(self):
+        wake_at = min(self.due.values()) if self.due else None
+        if wake_at == self._armed_for: return
+        if self.job is not None: self.widget.after_cancel(self.job); self.job = None
+        self._armed_for = wake_at
+        if wake_at is not None:
+            self.job = self.widget.after(max(1, math.ceil((wake_at - CLOCK.monotonic()) * 1000 / CLOCK.rate)), self._fire)
+
+    def _fire(self):
+        self.job = None; self._armed_for = None; self.wakeups += 1
+        now = CLOCK.monotonic()
+        try:
+            for bar in [bar for bar, at in self.due.items() if at <= now + self.COALESCE]:
+                del self.due[bar]
+                try: bar._update_tick() # Asks for its next wakeup itself
+                except Exception: # One broken bar mustn't stop the others
+                    report_error("update tick")
+                    self.due.setdefault(bar, now + self.RETRY)
+        finally: self._arm()
+
+# --- Main Application ---
+class TrackerBar:
+    """One progress bar window with its own schedule and settings.
+
+    Mixed into a Tk window class. TimeProgressBar (the main window) is a bar too, and
+    owns what all bars share: the tick scheduler, journal, timers and config watch.
+    """
+    MAX_UPDATE_INTERVAL = 300 # seconds
+    FADE_SECONDS = 0.4; FADE_STEPS = 8 # Theme cross-fade; each step is one gradient image
+    journals_days = False # Only the main bar journals workday starts and ends
+
+    def _init_bar(self, app, config_manager):
+        self.app = app
         self.config_manager = config_manager
-        self.drag_info = {}; self.current_percentage = 0.0
+        self.schedule = DaySchedule(config_manager)
+        self._journal_day = None; self._journal_day_done = False
+        self.drag = None; self.current_percentage = 0.0
         self.target_percentage = 0.0; self.animation_job = None
+        self._last_frame_time = None; self._last_frame_key = None
+        self.animation_stats = {'rendered': 0, 'skipped': 0}
         self.time_remaining_seconds = 0
         self.total_work_seconds = 3600 # Default to 1 hour to prevent zero division
 
         self.overrideredirect(True); self.attributes("-topmost", True)
         self.attributes("-transparentcolor", "black"); self.configure(bg="black")
 
-        self.canvas = tk.Canvas(self, bg="black", highlightthickness=0)
+        self.canvas = TrackerCanvas(self, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
         self.label = tk.Label(self, bg="#000001", fg="white", font=("Segoe UI", 9, "bold"))
-
-        self.active_timers = [] # List to hold multiple timer windows
-
-        self._create_context_menu(); self._bind_events(); self.apply_config()
-        threading.Thread(target=self._update_loop, daemon=True).start()
+        self._label_text = None; self._label_visible = False
+        self.scene = BarScene(self.canvas, getattr(app, 'gradients', None)) # Bars share the gradient images
+        self.painted = False; self.report_startup = False
+        self._snap_to_target = False
+        self._drawn_colors = None; self._fade = None; self._fade_job = None
+        self.context_menu = None # Built on the first right-click
+        track_visibility(self, self.canvas, self._on_visibility)
+        self._bind_events()
 
     def _create_context_menu(self):
+        app = self.app
         self.context_menu = tk.Menu(self, tearoff=0, bg="#333333", fg="white")
-        self.context_menu.add_command(label="Settings", command=self.open_settings)
+        self.context_menu.add_command(label="Settings", command=app.open_settings)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Start Break", command=app._start_break)
+        self.context_menu.add_command(label="End Break", command=app._end_break)
+        self._update_break_menu()
         self.context_menu.add_separator()
-        self.context_menu.add_command(label="Start Break", command=self._start_break)
-        self.context_menu.add_command(label="End Break", command=self._end_break, state="disabled")
+        self.context_menu.add_command(label="Start Timer", command=app.open_timer_setter)
+        self.context_menu.add_command(label="History", command=app.show_history)
         self.context_menu.add_separator()
-        self.context_menu.add_command(label="Start Timer", command=self.open_timer_setter)
+        self.profiling_var = tk.BooleanVar(value=PROFILER.enabled)
+        self.context_menu.add_checkbutton(label="Profiling", variable=self.profiling_var,
+                                          command=lambda: app._toggle_profiling(self.profiling_var.get()))
+        self.context_menu.add_command(label="Profiler Stats", command=app.open_profiler)
+        self.context_menu.add_command(label="Dump Profiler Stats", command=app.dump_profile)
         self.context_menu.add_separator()
-        self.context_menu.add_command(label="Quit", command=self.quit)
+        self.context_menu.add_command(label="Quit", command=app.quit)
 
     def _bind_events(self):
         self.bind("<ButtonPress-1>", self._on_press); self.bind("<B1-Motion>", self._on_drag)
         self.bind("<ButtonRelease-1>", self._on_release); self.bind("<Button-3>", self._show_context_menu)
+        self.canvas.bind("<Configure>", lambda e: self._redraw_canvas()) # First paint and resizes
+
+    def _begin_journal_day(self, day):
+        """Journals the start of each workday once, even across restarts, and picks up its earlier breaks."""
+        self._journal_day = day.start; self._journal_day_done = False
+        if not day.intervals: return # Day off
+        journal = self.app.journal
+        first, last = day.start_of_day.date(), CLOCK.today()
+        if self.journals_days and not journal.records(first, first, "day_start"):
+            journal.record("day_start", day.start, end=day.end)
+        spans, _ = journal.breaks(first, last, day.start) # A break left running by a crash isn't resumed
+        day.set_breaks(spans)
+
+    def _journal_day_end(self, day, now):
+        """Journals the end of each workday once, at the moment its work actually ran out."""
+        if self.time_remaining_seconds > 0 or self._journal_day_done or not day.intervals: return
+        self._journal_day_done = True
+        if not self.journals_days: return
+        journal = self.app.journal
+        end = day.projected_end(now)
+        first, last = day.start_of_day.date(), datetime.date.fromtimestamp(end)
+        if not any(day.start <= r["t"] < day.next_start for r in journal.records(first, last, "day_end")):
+            journal.record("day_end", end)
+
+    def _schedule_update(self, delay_seconds=0):
+        """(Re)arm this bar's update tick on the shared scheduler. Nothing is armed while hidden."""
+        if not self.visible: # _on_visibility() catches up when the bar shows again
+            self.app.tick_scheduler.cancel(self); return
+        self.app.tick_scheduler.schedule(self, delay_seconds)
+
+    def _on_visibility(self, visible):
+        """Power mode: while the bar can't be seen (minimized, unmapped, fully covered) no
+        update or animation callbacks run; showing it again catches up in one redraw."""
+        if visible:
+            self._snap_to_target = True # Jump straight to where the bar should be
+            self._schedule_update()
+        else:
+            self.app.tick_scheduler.cancel(self)
+            if self.animation_job is not None: self.after_cancel(self.animation_job); self.animation_job = None
+        self.app._update_watch()
 
-    def _calculate_day_range(self):
-        """Calculates and returns start, end, and total seconds for the workday."""
-        now = datetime.datetime.now()
-        start_h, start_m = map(int, self.config_manager.get('start_time').split(':'))
-        start_of_day = now.replace(hour=start_h, minute=start_m, second=0, microsecond=0)
-        
-        mode = self.config_manager.get('behavior.day_definition_mode')
-        if mode == "Start Time & Duration":
-            end_of_day = start_of_day + datetime.timedelta(hours=self.config_manager.get('behavior.duration_hours'))
-        else: # "Start Time & End Time"
-            end_h, end_m = map(int, self.config_manager.get('end_time').split(':'))
-            end_of_day = now.replace(hour=end_h, minute=end_m, second=0, microsecond=0)
-            if end_of_day < start_of_day: end_of_day += datetime.timedelta(days=1)
-        
-        # If 'now' is before the workday started, look at yesterday's workday
-        if now < start_of_day:
-            start_of_day -= datetime.timedelta(days=1)
-            end_of_day -= datetime.timedelta(days=1)
-            
-        total_seconds = (end_of_day - start_of_day).total_seconds()
-        return start_of_day, end_of_day, total_seconds
-
-    def _update_loop(self):
-        while True:
-            try:
-                now = datetime.datetime.now()
-                start_of_day, end_of_day, total_seconds = self._calculate_day_range()
-                
-                self.total_work_seconds = total_seconds if total_seconds > 0 else 1
-                
-                elapsed_seconds = (now - start_of_day).total_seconds()
-                self.time_remaining_seconds = self.total_work_seconds - elapsed_seconds
-                
-                # CHANGE: Percentage is now based on time REMAINING
-                self.target_percentage = max(0, min(100, (self.time_remaining_seconds / self.total_work_seconds) * 100))
-                
-                if self.animation_job is None: self.after(0, self._animate_bar)
-            except (ValueError, TypeError): 
-                self.target_percentage = 0
-                self.total_work_seconds = 3600 # Reset on error
-            time.sleep(self.config_manager.get('behavior.update_interval_seconds'))
-
+    @profiled("update_tick")
+    def _update_tick(self):
+        try:
+            now = CLOCK.time()
+            day = self.schedule.refresh(now)
+            if day.start != self._journal_day: self._begin_journal_day(day)
+
+            # CHANGE: Percentage is now based on time REMAINING
+            self.total_work_seconds, self.time_remaining_seconds, self.target_percentage = bar_progress(day, now)
+
+            if self.animation_job is None: self._animate_bar()
+            self._journal_day_end(day, now)
+            delay = self._seconds_until_visible_change(self.time_remaining_seconds, day.next_start - now, *day.rate_change(now))
+        except (ValueError, TypeError):
+            self.target_percentage = 0
+            self.total_work_seconds = 3600 # Reset on error
+            delay = self.config_manager.settings.update_interval_seconds
+        self._schedule_update(delay)
+
+    def _seconds_until_visible_change(self, remaining, until_next_day, working=True, until_rate_change=math.inf):
+        """Seconds until the bar, the label or the day itself would render differently.
+
+        Work time only passes while `working`; outside work intervals nothing moves
+        until `until_rate_change`, except the projected end during an ad-hoc break.
+        behavior.update_interval_seconds is the finest resolution we wake up at, and
+        MAX_UPDATE_INTERVAL bounds the sleep so clock jumps are picked up eventually.
+        """
+        cfg = self.config_manager.settings
+        h = self.winfo_height()
+        if h <= 1: h = cfg.height # Not mapped yet
+        steps = visible_steps(cfg, self.total_work_seconds, h)
+        return next_change_delay(remaining, steps, until_next_day, working, until_rate_change,
+                                 end_label_moves(cfg, self.schedule.on_break),
+                                 cfg.update_interval_seconds, self.MAX_UPDATE_INTERVAL)
+
+    @profiled("animate_bar")
     def _animate_bar(self):
-        diff = self.target_percentage - self.current_percentage
-        if abs(diff) < 0.1: 
+        """Eases the bar toward its target in pixel space.
+
+        Frames are capped at behavior.animation_fps (0 jumps straight to the target),
+        and a frame that would render exactly like the last one is counted and skipped.
+        """
+        self.animation_job = None
+        cfg = self.config_manager.settings; fps = cfg.animation_fps
+        h = self.winfo_height()
+        if h <= 1: h = cfg.height # Not mapped yet
+        now = time.monotonic()
+        diff_px = (self.target_percentage - self.current_percentage) * h / 100
+        if fps <= 0 or abs(diff_px) < 0.5 or self._snap_to_target or not self.visible:
             self.current_percentage = self.target_percentage
-            self.animation_job = None
-        else: 
-            self.current_percentage += diff * 0.15
-            self.animation_job = self.after(16, self._animate_bar)
-        self._redraw_canvas()
+            self._last_frame_time = None; self._snap_to_target = False
+        else:
+            # Ease 15% of the way per 60 Hz frame, whatever the frame-rate cap is
+            dt = min(max(now - self._last_frame_time, 1 / fps), 0.25) if self._last_frame_time else 1 / fps
+            self.current_percentage += (self.target_percentage - self.current_percentage) * (1 - 0.85 ** (dt * 60))
+            self._last_frame_time = now
+            self.animation_job = self.after(max(1, round(1000 / fps)), self._animate_bar)
+        if self._frame_key(h) == self._last_frame_key:
+            self.animation_stats['skipped'] += 1
+        else:
+            self._redraw_canvas(); self.animation_stats['rendered'] += 1
+
+    def _frame_key(self, h):
+        """Everything that decides what a frame looks like; equal keys render identical frames."""
+        cfg = self.config_manager.settings
+        label = self._label_text_now() if cfg.show_text_label else None
+        return cfg.version, BarScene.bar_top(h, self.current_percentage), self.time_remaining_seconds <= 0, label
 
+    @profiled("redraw_canvas")
     def _redraw_canvas(self):
-        self.canvas.delete("all"); w, h = self.winfo_width(), self.winfo_height()
+        w, h = self.winfo_width(), self.winfo_height()
         if w <= 1 or h <= 1: return
-        
-        r = min(self.config_manager.get('appearance.corner_radius'), w//2, h//2)
-        bg_color = self.config_manager.get('appearance.background_color')
-        
-        # Draw background
-        self._create_rounded_rectangle(0, 0, w, h, r, fill=bg_color)
-
-        # Draw the progress bar (time remaining)
-        bar_height = h * (self.current_percentage / 100); y0 = h - bar_height
-        c1 = self.config_manager.get('appearance.bar_color_1'); c2 = self.config_manager.get('appearance.bar_color_2')
-        if self.time_remaining_seconds <= 0:
-            c1 = self.config_manager.get('appearance.completed_color')
-            c2 = c1
-        if c1 == c2:
-            self._create_rounded_rectangle(0, y0, w, h, r, fill=c1)
-        else:
-            self._create_gradient_bar(0, y0, w, h, r, c1, c2)
 
-        # NEW: Draw hourly segment lines on TOP of the bar
+        cfg = self.config_manager.settings
+        r = min(cfg.corner_radius, w//2, h//2)
+        colors = (cfg.background_color, *bar_colors(cfg, self.time_remaining_seconds))
+        if self._fade is not None:
+            old, started = self._fade
+            step = int((time.monotonic() - started) / self.FADE_SECONDS * self.FADE_STEPS)
+            if step >= self.FADE_STEPS: self._fade = None
+            else:
+                try: colors = tuple(PALETTE.mix(a, b, step / self.FADE_STEPS) for a, b in zip(old, colors))
+                except tk.TclError: self._fade = None
+        self._drawn_colors = colors
         total_hours = round(self.total_work_seconds / 3600)
-        if total_hours > 1:
-            segment_height = h / total_hours
-            for i in range(1, total_hours):
-                y_pos = i * segment_height
-                # A faint line that contrasts with a dark background
-                self.canvas.create_line(0, y_pos, w, y_pos, fill="#555555", width=1)
-        
+        self.scene.render(w, h, r, *colors, self.current_percentage, total_hours)
+
         # NEW: Conditionally show or hide the label
-        if self.config_manager.get('behavior.show_text_label'):
-            self._update_label_text()
-            self.label.place(relx=0.5, rely=0.5, anchor="center")
-        else:
-            self.label.place_forget() # Hide the label
-
-    def _create_rounded_rectangle(self, x1, y1, x2, y2, r, **kwargs):
-        p = [x1+r, y1, x2-r, y1, x2, y1, x2, y1+r, x2, y2-r, x2, y2, x2-r, y2, x1+r, y2, x1, y2, x1, y2-r, x1, y1+r, x1, y1]
-        self.canvas.create_polygon(p, **kwargs, smooth=True, joinstyle=tk.ROUND)
-
-    def _create_gradient_bar(self, x1, y1, x2, y2, r, c1, c2):
-        try: c1r,c2r = self.winfo_rgb(c1), self.winfo_rgb(c2)
-        except tk.TclError: return
-        h = y2 - y1;
-        if h <= 0: return
-        r_rat,g_rat,b_rat = (c2r[0]-c1r[0])/h, (c2r[1]-c1r[1])/h, (c2r[2]-c1r[2])/h
-        for i in range(int(y1), int(y2)):
-            nr,ng,nb = int(c1r[0]+(i-y1)*r_rat), int(c1r[1]+(i-y1)*g_rat), int(c1r[2]+(i-y1)*b_rat)
-            color = f'#{max(0,min(65535,nr)):04x}{max(0,min(65535,ng)):04x}{max(0,min(65535,nb)):04x}'
-            self.canvas.create_line(x1, i, x2, i, fill=color)
-        self._create_rounded_rectangle(x1, y1, x2, y2, r, fill="", outline="") # Use empty fill/outline to clip
+        show_label = cfg.show_text_label
+        if show_label: self._update_label_text()
+        if show_label != self._label_visible:
+            if show_label: self.label.place(relx=0.5, rely=0.5, anchor="center")
+            else: self.label.place_forget() # Hide the label
+            self._label_visible = show_label
+        self._last_frame_key = self._frame_key(h)
+        if not self.painted:
+            self.painted = True; mark_startup("first_paint")
+            if self.report_startup: print(f"Startup: {startup_report()}", file=sys.stderr)
+
+    def fade_colors(self):
+        """Cross-fades from the colors on screen to whatever the config says next (theme changes)."""
+        if self._drawn_colors is None or not self.visible: return
+        self._fade = (self._drawn_colors, time.monotonic())
+        if self._fade_job is None: self._fade_step()
+
+    def _fade_step(self):
+        self._fade_job = None
+        if not self.visible: self._fade = None
+        if self._fade is None: return
+        self._redraw_canvas()
+        if self._fade is not None: self._fade_job = self.after(round(1000 * self.FADE_SECONDS / self.FADE_STEPS), self._fade_step)
 
-    def _update_label_text(self):
-        mode = self.config_manager.get('behavior.display_mode')
-        # Since the bar shows remaining time, the text should be consistent
-        if self.time_remaining_seconds > 0:
-            h, rem = divmod(self.time_remaining_seconds, 3600)
-            m, _ = divmod(rem, 60)
-            h, m = int(h), int(m)
-            if mode == "Time Remaining":
-                text = f"{h}h {m}m" if h > 0 else f"{m}m"
-            elif mode == "End Time":
-                _, end_of_day, _ = self._calculate_day_range()
-                text = f"Ends {end_of_day.strftime('%H:%M')}"
-            else: # Percentage mode
-                text = f"{self.current_percentage:.0f}%"
-        else:
-            text = "Done"
-        self.label.config(text=text)
+    def _label_text_now(self):
+        return label_text(self.config_manager.settings.display_mode, self.time_remaining_seconds,
+                          self.current_percentage, self.schedule.end_label)
 
-    def apply_config(self):
-        self.attributes("-topmost", True)
-        app = self.config_manager.get('appearance')
-        self.attributes("-alpha", app['opacity'])
-        self.label.configure(fg=app['text_color'], bg="#000001")
-        self.attributes("-transparentcolor", "#000001")
+    @profiled("update_label_text")
+    def _update_label_text(self):
+        text = self._label_text_now()
+        if text != self._label_text:
+            self.label.config(text=text); self._label_text = text
+
+    def apply_config(self, changed=None):
+        """Applies the config to this bar's window.
+
+        `changed` is a set of ConfigManager.categorize() categories; only the Tk calls
+        those categories need are made. None applies everything.
+        """
+        everything = changed is None
+        cfg = self.config_manager.settings
+        if everything or 'window' in changed:
+            self.attributes("-topmost", True)
+            self.attributes("-alpha", cfg.opacity)
+            self.attributes("-transparentcolor", "#000001")
+        if everything or 'colors' in changed:
+            self.label.configure(fg=cfg.text_color, bg="#000001")
 
         # NEW: Auto-positioning logic
-        if self.config_manager.get('behavior.auto_position'):
-            screen_height = self.winfo_screenheight()
-            self.geometry(f"{self.config_manager.get('geometry.width')}x{screen_height}+0+0")
-        else:
-            geo = self.config_manager.get('geometry')
-            self.geometry(f"{geo['width']}x{geo['height']}+{geo['x']}+{geo['y']}")
+        if everything or 'geometry' in changed:
+            if cfg.auto_position:
+                screen_height = self.winfo_screenheight()
+                self.geometry(f"{cfg.width}x{screen_height}+{self._auto_x()}+0")
+            else:
+                self.geometry(f"{cfg.width}x{cfg.height}+{cfg.x}+{cfg.y}")
 
         self._redraw_canvas()
+        if everything or 'geometry' in changed or 'behavior' in changed:
+            self._schedule_update() # Schedule, size or label settings may move the next visible change
+
+    def _auto_x(self):
+        """Auto-positioned bars line up from the left edge of the screen, in config order."""
+        x = 0
+        for bar in self.app.bars:
+            if bar is self: break
+            cfg = bar.config_manager.settings
+            if cfg.auto_position: x += cfg.width
+        return x
+
+    def _on_press(self, e):
+        if self.config_manager.settings.auto_position: return
+        follow = self.app is self and self.config_manager.settings.timers_follow_bar
+        self.drag = self.app.start_drag(self, e, self.app._timer_windows() if follow else ())
+    def _on_drag(self, e):
+        if self.drag is not None: self.drag.motion(e)
+    def _on_release(self, e):
+        if self.drag is None: return
+        (x, y), start = self.drag.finish(), (self.drag.x0, self.drag.y0); self.drag = None
+        if (x, y) != start: # A plain click doesn't rewrite the config
+            self.config_manager.set('geometry.x', x); self.config_manager.set('geometry.y', y)
+            self.config_manager.save_config()
+    def _show_context_menu(self, e):
+        if self.context_menu is None: self._create_context_menu()
+        self.context_menu.post(e.x_root, e.y_root)
+
+    def _update_break_menu(self):
+        if self.context_menu is None: return
+        on_break = self.schedule.on_break
+        self.context_menu.entryconfig("Start Break", state="disabled" if on_break else "normal")
+        self.context_menu.entryconfig("End Break", state="normal" if on_break else "disabled")
+
+class TimeProgressBar(TrackerBar, tk.Tk):
+    """The main bar and Tk root. Owns what every bar shares: the tick scheduler, journal,
+    timers, control socket and config watch, plus the extra bars from config["bars"]."""
+    CONFIG_WATCH_INTERVAL = 2000 # ms
+    IDLE_CONFIG_WATCH_INTERVAL = 30000 # ms, once the day is done
+    journals_days = True
+
+    def __init__(self, config_manager):
+        super().__init__()
+        self.journal = Journal()
+        self.tick_scheduler = TickScheduler(self)
+        self.bars = [self] # The main bar first, then one ExtraBar per config["bars"] entry
+
+        self.active_timers = [] # CountdownTimers; each is drawn by its own window or by the dock
+        self.timer_store = TimerStore()
+        self.timer_scheduler = TimerScheduler(self, self.active_timers, self.timer_store)
+        self.timer_dock = None; self._timers_docked = None
+        self.control_server = None
+
+        self._dirty = set(); self._apply_job = None
+        self.wakeups = {'config_watch': 0}
+        self.watch_job = None
+        self._init_bar(self, config_manager)
+        PALETTE.resolve = self.winfo_rgb # Color names are parsed by Tk, once each
+        self.gradients = self.scene.gradients
+        self.apply_config()
+        self.after_idle(self._restore_timers) # Their windows come after the bar's first paint
+        self.watch_job = self.after(self.CONFIG_WATCH_INTERVAL, self._watch_config)
+
+    def request_apply(self, key_path):
+        """Marks what `key_path` affects as dirty; all changes made within a frame are applied together."""
+        self._dirty.add(self.config_manager.categorize(key_path))
+        if self._apply_job is None: self._apply_job = self.after(16, self._flush_dirty)
+
+    def _flush_dirty(self):
+        self._apply_job = None
+        changed, self._dirty = self._dirty, set()
+        if changed: self.apply_config(changed)
+
+    def apply_config(self, changed=None):
+        """Applies the config to every bar and the open timers; see TrackerBar.apply_config()."""
+        self._apply_to(super().apply_config, changed)
+        if changed is None: self._sync_bars()
+        for bar in self.bars[1:]: self._apply_to(bar.apply_config, changed) # Extra bars inherit the main bar's keys
+        if changed is None or 'behavior' in changed:
+            if self.config_manager.settings.timer_dock != self._timers_docked: self._dock_timers(self.config_manager.settings.timer_dock)
+        for view in self._timer_views(): self._apply_to(view.apply_config, changed)
+
+    @staticmethod
+    def _apply_to(apply_config, changed):
+        """A color Tk rejects (e.g. from a hand-edited file) leaves that one window as it was."""
+        try: apply_config(changed)
+        except tk.TclError: pass
+
+    def _sync_bars(self):
+        """Opens or closes extra bars until there is one per config["bars"] entry."""
+        extra = self.config_manager.get('bars')
+        count = len(extra) if isinstance(extra, list) else 0
+        while len(self.bars) - 1 < count:
+            self.bars.append(ExtraBar(self, BarConfig(self.config_manager, len(self.bars) - 1)))
+        while len(self.bars) - 1 > count: self.bars.pop().close()
+
+    def _update_watch(self):
+        """The config watch runs while any bar can be seen."""
+        visible = any(bar.visible for bar in self.bars)
+        if visible and self.watch_job is None: self._watch_config()
+        elif not visible and self.watch_job is not None: self.after_cancel(self.watch_job); self.watch_job = None
+
+    def _watch_config(self):
+        """Applies external edits to the config file and reports failed background saves."""
+        self.watch_job = None; self.wakeups['config_watch'] += 1
+        if self.config_manager.reload_if_changed(): self.apply_config()
+        error = self.config_manager.pop_save_error()
+        if error: self._show_error("Config Error", f"Could not save configuration file:\n{error}")
+        error, self.journal.write_error = self.journal.write_error, None
+        if error: self._show_error("Journal Error", f"Could not write to the journal:\n{error}")
+        error, self.timer_store.save_error = self.timer_store.save_error, None
+        if error: self._show_error("Timer Error", f"Could not save the running timers:\n{error}")
+        if not any(bar.visible for bar in self.bars): return # All hidden: _update_watch() restarts the watch
+        done = all(bar.time_remaining_seconds <= 0 for bar in self.bars) # Nothing moves until tomorrow; poll less often
+        self.watch_job = self.after(self.IDLE_CONFIG_WATCH_INTERVAL if done else self.CONFIG_WATCH_INTERVAL, self._watch_config)
 
     def open_settings(self):
         if not hasattr(self, 'settings_window') or not self.settings_window.winfo_exists():
             self.settings_window = SettingsWindow(self, self.config_manager)
-        self.settings_window.lift()
+        else:
+            self.settings_window.show()
+
+    def show_history(self):
+        from tkinter import messagebox
+        today = CLOCK.today()
+        week_start = today - datetime.timedelta(days=today.weekday())
+        break_seconds = int(self.journal.break_seconds(week_start, today))
+        h, rem = divmod(break_seconds, 3600); m, s = divmod(rem, 60)
+        timers = self.journal.timers_completed(today - datetime.timedelta(days=29), today)
+        messagebox.showinfo("History", f"Break time this week: {h}h {m:02d}m {s:02d}s\n"
+                                       f"Timers completed in the last 30 days: {timers}", parent=self)
+
+    def _toggle_profiling(self, enabled):
+        PROFILER.enabled = enabled
+        for bar in self.bars:
+            if bar.context_menu is not None: bar.profiling_var.set(enabled)
+
+    def profile_counters(self):
+        """Counters the profiler can't time itself, shown next to its sections."""
+        frames = {k: sum(bar.animation_stats[k] for bar in self.bars) for k in self.animation_stats}
+        return {'animation_frames': frames, 'timer_wakeups': self.timer_scheduler.wakeups, 'bars': len(self.bars),
+                'wakeups': {'update': self.tick_scheduler.wakeups, **self.wakeups}, 'startup_ms': dict(STARTUP_TIMES),
+                'errors': dict(ERROR_COUNTS)}
+
+    def open_profiler(self):
+        if not hasattr(self, 'profiler_window') or not self.profiler_window.winfo_exists():
+            self.profiler_window = ProfilerWindow(self)
+        self.profiler_window.lift()
+
+    def dump_profile(self):
+        from tkinter import messagebox
+        try: path = PROFILER.dump(extra=self.profile_counters())
+        except IOError as e: messagebox.showerror("Profiler", f"Could not write profiler stats:\n{e}")
+        else: messagebox.showinfo("Profiler", f"Profiler stats written to {os.path.abspath(path)}")
+
+    def _show_error(self, title, message):
+        from tkinter import messagebox
+        messagebox.showerror(title, message)
 
     def open_timer_setter(self):
         if not hasattr(self, 'setter_window') or not self.setter_window.winfo_exists():
             self.setter_window = TimerSetterWindow(self, self.config_manager)
         self.setter_window.lift()
 
-    def _on_press(self, e): self.drag_info = {'x':self.winfo_x(), 'y':self.winfo_y(), 'mx':e.x_root, 'my':e.y_root}
-    def _on_drag(self, e):
-        if self.drag_info and not self.config_manager.get('behavior.auto_position'):
-            self.geometry(f"+{self.drag_info['x']+(e.x_root-self.drag_info['mx'])}+{self.drag_info['y']+(e.y_root-self.drag_info['my'])}")
-    def _on_release(self, e):
-        if self.drag_info:
-            self.config_manager.set('geometry.x', self.winfo_x()); self.config_manager.set('geometry.y', self.winfo_y())
-            self.config_manager.save_config(); self.drag_info = {}
-    def _show_context_menu(self, e): self.context_menu.post(e.x_root, e.y_root)
+    def start_control_server(self):
+        try: self.control_server = ControlServer(self, self.handle_command)
+        except (OSError, AttributeError) as e: # AttributeError: no Unix sockets / file handlers here
+            self._show_error("Control Socket", f"Could not start the control socket:\n{e}")
+
+    def handle_command(self, command):
+        """Runs one control-socket command on the Tk thread and returns the reply."""
+        cmd = command.get("cmd")
+        if cmd == "state":
+            now = CLOCK.time(); day = self.schedule.refresh(now)
+            state = day_status(day, now, self.config_manager.settings.display_mode)
+            state["timers"] = [{"label": t.label, "duration": t.duration, "remaining": round(max(0, t.deadline - now), 1)}
+                               for t in self.active_timers if not t.finished]
+            if len(self.bars) > 1: # The main bar's state is the top level; extra bars follow in config order
+                state["bars"] = [day_status(bar.schedule.refresh(now), now, bar.config_manager.settings.display_mode)
+                                 for bar in self.bars[1:]]
+            return {"ok": True, **state}
+        if cmd == "start_break":
+            if self.schedule.on_break: return {"ok": False, "error": "already on a break"}
+            self._start_break(); return {"ok": True}
+        if cmd == "end_break":
+            if not self.schedule.on_break: return {"ok": False, "error": "not on a break"}
+            started = self.schedule.breaks[-1][0]; self._end_break()
+            return {"ok": True, "seconds": round(CLOCK.time() - started, 3)}
+        if cmd == "start_timer":
+            try: seconds = float(command["seconds"])
+            except (KeyError, TypeError, ValueError): seconds = 0
+            if not (math.isfinite(seconds) and 0 < seconds <= CountdownTimer.MAX_SECONDS):
+                return {"ok": False, "error": f"start_timer needs 0 < \"seconds\" <= {CountdownTimer.MAX_SECONDS}"}
+            timer = self.start_timer(seconds, str(command.get("label", "")))
+            return {"ok": True, "deadline": round(timer.deadline, 3)}
+        if cmd == "reload_config":
+            changed = self.config_manager.reload_if_changed(force=True)
+            if changed: self.apply_config()
+            return {"ok": True, "changed": changed}
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+    def start_timer(self, duration_seconds, label=""):
+        timer = CountdownTimer(self.journal, duration_seconds, label)
+        self.active_timers.append(timer)
+        self._show_timer(timer)
+        self.timer_scheduler.reschedule()
+        self.timer_store.save(self.active_timers)
+        return timer
+
+    def remove_timer(self, timer):
+        """Closes a timer; one that hasn't run out is journaled as cancelled."""
+        timer.cancel()
+        if timer in self.active_timers: self.active_timers.remove(timer); self.timer_store.save(self.active_timers)
+        if timer.view is not None: timer.view.detach(timer); timer.view = None
+
+    def _restore_timers(self):
+        """Brings back the timers saved by the last run; ones that ran out meanwhile finish right away."""
+        for saved in self.timer_store.load():
+            timer = CountdownTimer(self.journal, float(saved["duration"]), str(saved.get("label", "")), float(saved["deadline"]))
+            self.active_timers.append(timer)
+            self._show_timer(timer)
+        self.timer_scheduler.reschedule()
+
+    def _show_timer(self, timer):
+        if self.config_manager.settings.timer_dock:
+            if self.timer_dock is None or not self.timer_dock.winfo_exists():
+                self.timer_dock = TimerDock(self, self.config_manager)
+            self.timer_dock.add(timer)
+        else:
+            # Stack standalone timers under the last one, or start level with the bar
+            windows = [v for v in self._timer_views() if isinstance(v, CircularTimerWindow)]
+            y = windows[-1].position()[1] + 110 if windows else None # 100px windows, 10px apart
+            CircularTimerWindow(self, self.config_manager, timer, y=y)
+
+    def _timer_views(self):
+        return list(dict.fromkeys(t.view for t in self.active_timers if t.view is not None))
+
+    def _timer_windows(self):
+        """The timer views on screen (standalone windows and the dock)."""
+        return [view for view in self._timer_views() if view.winfo_ismapped()]
+
+    def start_drag(self, window, e, followers=(), geometry=None):
+        """A WindowDrag for `window` that snaps to the screen and to the other bars and timer windows."""
+        moving = {window, *followers}
+        others = [w for w in self.bars + self._timer_windows() if w not in moving and w.winfo_ismapped()]
+        return WindowDrag(window, e, self.config_manager.settings.snap_distance, others, followers, geometry)
+
+    def _dock_timers(self, docked):
+        """Moves the running timers into the dock, or back out into windows, when the setting changes."""
+        first = self._timers_docked is None
+        self._timers_docked = docked
+        if first: return
+        for timer in self.active_timers:
+            if timer.finished or isinstance(timer.view, TimerDock) == docked: continue
+            timer.view.detach(timer); timer.view = None
+            self._show_timer(timer)
+
 
     def _start_break(self):
-        self.break_start_time = datetime.datetime.now()
-        self.context_menu.entryconfig("Start Break", state="disabled")
-        self.context_menu.entryconfig("End Break", state="normal")
+        """Starts an ad-hoc break on every bar; it's journaled once."""
+        now = CLOCK.time()
+        for bar in self.bars:
+            bar.schedule.start_break(now)
+            bar._update_break_menu(); bar._schedule_update() # Work time stops passing
+        self.journal.record("break_start", now)
 
     def _end_break(self):
-        if hasattr(self, 'break_start_time'):
-            break_duration = datetime.datetime.now() - self.break_start_time
-            start_of_day, _, _ = self._calculate_day_range()
-            new_start_of_day = start_of_day + break_duration
-            self.config_manager.set('start_time', new_start_of_day.strftime('%H:%M'))
-            self.context_menu.entryconfig("Start Break", state="normal")
-            self.context_menu.entryconfig("End Break", state="disabled")
-            del self.break_start_time
+        """Ends an ad-hoc break; the break doesn't count as work, so the day ends that much later."""
+        now = CLOCK.time()
+        started = self.schedule.end_break(now)
+        if started is None: return
+        for bar in self.bars[1:]: bar.schedule.end_break(now)
+        self.journal.record("break_end", now, seconds=round(now - started, 3))
+        for bar in self.bars: bar._update_break_menu(); bar._schedule_update()
+
+class ExtraBar(TrackerBar, tk.Toplevel):
+    """A bar from config["bars"], drawn in its own window on the main bar's Tk root."""
+    def __init__(self, app, config_manager):
+        super().__init__(app)
+        self._init_bar(app, config_manager)
+
+    def close(self):
+        self.app.tick_scheduler.cancel(self)
+        if self.animation_job is not None: self.after_cancel(self.animation_job)
+        self.destroy()
+
+# --- Timers ---
+class CountdownTimer:
+    """One running countdown. Its `view` (a CircularTimerWindow or the TimerDock) draws it.
+
+    The deadline is wall-clock (CLOCK.time()) so a timer keeps running through a
+    suspend or a restart; `deadline` is given when restoring a saved timer.
+    """
+    MAX_SECONDS = 7 * 86400
+
+    def __init__(self, journal, duration_seconds, label="", deadline=None):
+        self.journal = journal
+        self.duration = duration_seconds
+        self.label = label
+        self.remaining_seconds = duration_seconds
+        self.finished = False
+        self.view = None
+        if deadline is None:
+            self.deadline = CLOCK.time() + duration_seconds
+            journal.record("timer_start", duration=duration_seconds)
+        else:
+            self.deadline = deadline; self.remaining_seconds = max(0, min(duration_seconds, deadline - CLOCK.time()))
+
+    def tick(self, now):
+        """Remaining time is always derived from the deadline; returns True when the timer just ran out."""
+        remaining = self.deadline - now
+        if remaining > 0:
+            self.remaining_seconds = remaining; return False
+        self.remaining_seconds = 0; self.finished = True
+        self.journal.record("timer_finish", self.deadline, duration=self.duration) # When it ran out, even if we were not running
+        return True
+
+    def cancel(self):
+        if not self.finished:
+            self.journal.record("timer_cancel", duration=self.duration, remaining=round(self.remaining_seconds, 3))
+        self.finished = True
+
+    @property
+    def fraction(self): return self.remaining_seconds / self.duration if self.duration > 0 else 0
+
+    @property
+    def text(self):
+        if self.finished: text = "Done!"
+        else:
+            m, s = divmod(math.ceil(self.remaining_seconds), 60)
+            text = f"{int(m):02d}:{int(s):02d}"
+        return f"{self.label[:10]}\n{text}" if self.label else text
+
+    def to_dict(self):
+        return {"deadline": round(self.deadline, 3), "duration": self.duration, "label": self.label}
+
+class TimerStore:
+    """The running timers in TIMERS_FILE, so they survive a restart.
+
+    The file holds only deadlines, durations and labels, so it is rewritten when a
+    timer is added or removed and never while timers tick.
+    """
+    TIMERS_FILE = "daytracker_timers.json"
+
+    def __init__(self):
+        self.save_error = None
+
+    def load(self):
+        """Saved timers as dicts; a missing or unreadable file means none."""
+        try:
+            with open(self.TIMERS_FILE, 'r') as f: saved = json.load(f)
+            return [t for t in saved if isinstance(t, dict) and math.isfinite(float(t["deadline"]))
+                    and 0 < float(t["duration"]) <= CountdownTimer.MAX_SECONDS] # Same limits as start_timer
+        except (IOError, ValueError, TypeError, KeyError):
+            return []
+
+    @profiled("timers_save")
+    def save(self, timers):
+        text = json.dumps([t.to_dict() for t in timers if not t.finished])
+        try: atomic_write(self.TIMERS_FILE, text)
+        except OSError as e: self.save_error = e
+
+# --- Timer Scheduling ---
+class TimerScheduler:
+    """Drives every active timer from a single after() chain.
+
+    Timers carry absolute CLOCK.time() deadlines, so redraw time never accumulates
+    as drift and a late wakeup (e.g. after a suspend) simply finds less time left.
+    Wakeups land on whole-second boundaries, or on a timer's own deadline when that
+    comes first, so one wakeup serves all open timers, and each view is redrawn once
+    per wakeup however many timers it shows. When no view can be seen, the only
+    wakeup is the next deadline, so alerts stay on time. A timer that runs out is
+    dropped from `store` right away, so a restart can't journal its finish twice.
+    """
+    def __init__(self, widget, timers, store=None):
+        self.widget = widget
+        self.timers = timers
+        self.store = store
+        self.job = None
+        self.wakeups = 0
+
+    def reschedule(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job); self.job = None
+        now = CLOCK.time()
+        running = [t for t in self.timers if not t.finished]
+        if not running: return
+        wake_at = self.wake_at([t.deadline for t in running], now, any(t.view is not None and t.view.visible for t in running))
+        delay_ms = max(1, math.ceil((wake_at - now) * 1000 / CLOCK.rate))
+        self.job = self.widget.after(delay_ms, self._tick)
+
+    @staticmethod
+    def wake_at(deadlines, now, seen):
+        """The next wakeup for timers due at `deadlines`: each whole second while one is `seen`, else the first deadline."""
+        wake_at = min(deadlines, default=math.inf)
+        return min(math.floor(now) + 1, wake_at) if seen and deadlines else wake_at
+
+    @profiled("timer_tick")
+    def _tick(self):
+        self.job = None; self.wakeups += 1
+        now = CLOCK.time(); views = {}; finished = False
+        try:
+            for timer in list(self.timers):
+                if timer.finished: continue
+                if timer.tick(now):
+                    finished = True
+                    if timer.view is not None: self._guarded(timer.view.timer_finished, timer)
+                elif timer.view is not None and timer.view.visible: views[timer.view] = True
+            if finished and self.store is not None: self.store.save(self.timers) # Finished timers aren't saved
+            for view in views: self._guarded(view.redraw)
+        finally: self.reschedule() # Whatever broke, the other timers and their alerts keep running
+
+    @staticmethod
+    def _guarded(call, *args):
+        """One view failing to draw must not stop the others."""
+        try: call(*args)
+        except Exception: report_error("timer view")
 
 # --- Timer Setter Window ---
 class TimerSetterWindow(tk.Toplevel):
     def __init__(self, master, config_manager):
+        from tkinter import ttk
         super().__init__(master)
         self.master = master
         self.config_manager = config_manager
@@ -332,6 +2073,7 @@ class TimerSetterWindow(tk.Toplevel):
 
         self.minutes_var = tk.StringVar(value="15")
         self.seconds_var = tk.StringVar(value="0")
+        self.label_var = tk.StringVar(value="")
 
         main_frame = ttk.Frame(self, padding=15)
         main_frame.pack(expand=True, fill="both")
@@ -347,25 +2089,23 @@ class TimerSetterWindow(tk.Toplevel):
         ttk.Label(input_frame, text="Seconds:").grid(row=1, column=0, padx=5, sticky="w")
         ttk.Entry(input_frame, textvariable=self.seconds_var, width=7).grid(row=1, column=1, padx=5)
 
+        ttk.Label(input_frame, text="Label:").grid(row=2, column=0, padx=5, sticky="w")
+        ttk.Entry(input_frame, textvariable=self.label_var, width=12).grid(row=2, column=1, padx=5)
+
         ttk.Button(main_frame, text="Start Timer", command=self._start_timer).pack(pady=(15, 0))
 
         self.center_window()
 
     def _start_timer(self):
+        from tkinter import messagebox
         try:
             minutes = int(self.minutes_var.get() or 0)
             seconds = int(self.seconds_var.get() or 0)
             total_seconds = (minutes * 60) + seconds
 
             if total_seconds > 0:
-                # Position the new timer under the last active one, or near the master
-                last_y = self.master.winfo_y()
-                if self.master.active_timers:
-                    last_y = self.master.active_timers[-1].winfo_y() + self.master.active_timers[-1].winfo_height() + 10
-
-                new_timer = CircularTimerWindow(self.master, self.config_manager, total_seconds, last_y)
-                self.master.active_timers.append(new_timer)
-                new_timer.lift()
+                timer = self.master.start_timer(total_seconds, self.label_var.get().strip())
+                timer.view.lift()
                 self.master.attributes("-topmost", True)
                 self.destroy()
             else:
@@ -379,80 +2119,88 @@ class TimerSetterWindow(tk.Toplevel):
         ww, wh = self.winfo_width(), self.winfo_height()
         x = mx + (mw // 2) - (ww // 2)
         y = my + (mh // 2) - (wh // 2)
-        self.geometry(f'250x150+{x}+{y}')
+        self.geometry(f'250x180+{x}+{y}')
 
 
 # --- Circular Timer Window ---
 class CircularTimerWindow(tk.Toplevel):
-    def __init__(self, master, config_manager, duration_seconds, y_pos):
+    """A standalone window showing one timer."""
+    def __init__(self, master, config_manager, timer, x=None, y=None):
         super().__init__(master)
         self.master = master
         self.config_manager = config_manager
-        self.duration = duration_seconds
-        self.remaining_seconds = duration_seconds
-        self.animation_job = None
-        self.drag_info = {}
+        self.timer = timer; timer.view = self
+        self.drag = None
 
         self.overrideredirect(True)
         self.attributes("-topmost", True)
         self.attributes("-transparentcolor", "black")
         self.configure(bg="black")
 
-        geo = self.config_manager.get('geometry')
-        screen_w = self.winfo_screenwidth()
-        x = geo['x'] + geo['width'] + 20
-        y = y_pos
-        if x + 100 > screen_w: # 100 is the window width
-            x = geo['x'] - 100 - 20
-        self.geometry(f"100x100+{x}+{y}")
+        cfg = self.config_manager.settings
+        if x is None:
+            screen_w = self.winfo_screenwidth()
+            x = cfg.x + cfg.width + 20
+            if x + 100 > screen_w: # 100 is the window width
+                x = cfg.x - 100 - 20
+        if y is None: y = master.winfo_y() if master.winfo_ismapped() else cfg.y # Restored at startup
+        self.geometry(f"100x100+{x}+{y}"); self._placed = (x, y)
 
-        self.canvas = tk.Canvas(self, bg="black", highlightthickness=0)
+        self.canvas = TrackerCanvas(self, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
 
         self.label = tk.Label(self, bg="#000001", fg="white", font=("Segoe UI", 12, "bold"))
         self.label.place(relx=0.5, rely=0.5, anchor="center")
+        self._label_text = None
+        self.scene = RingScene(self.canvas)
 
+        track_visibility(self, self.canvas, self._on_visibility)
         self._bind_events()
         self.apply_config()
-        self._update_timer()
 
     def _bind_events(self):
         self.bind("<ButtonPress-1>", self._on_press)
         self.bind("<B1-Motion>", self._on_drag)
+        self.bind("<ButtonRelease-1>", self._on_release)
         self.bind("<Button-3>", self._close_timer) # Right-click to close
 
-    def _on_press(self, e): self.drag_info = {'x': self.winfo_x(), 'y': self.winfo_y(), 'mx': e.x_root, 'my': e.y_root}
+    def _on_press(self, e): self.drag = self.master.start_drag(self, e)
     def _on_drag(self, e):
-        if self.drag_info:
-            self.geometry(f"+{self.drag_info['x'] + (e.x_root - self.drag_info['mx'])}+{self.drag_info['y'] + (e.y_root - self.drag_info['my'])}")
-    
+        if self.drag is not None: self.drag.motion(e)
+    def _on_release(self, e):
+        if self.drag is not None: self.drag.finish(); self.drag = None
+
+    def _on_visibility(self, visible):
+        if visible: self.redraw() # Catch up on the ticks skipped while hidden
+        self.master.timer_scheduler.reschedule()
+
+    def position(self):
+        """Where the window is, or where it was placed if it isn't mapped yet."""
+        return (self.winfo_x(), self.winfo_y()) if self.winfo_ismapped() else self._placed
+
     def _close_timer(self, e=None):
-        if self.animation_job:
-            self.after_cancel(self.animation_job)
-        self.animation_job = None
-        if self in self.master.active_timers:
-            self.master.active_timers.remove(self)
-        self.destroy()
+        self.master.remove_timer(self.timer)
 
-    def apply_config(self):
-        app = self.config_manager.get('appearance')
-        timer_app = self.config_manager.get('appearance.timer')
-        self.attributes("-alpha", app['opacity'])
-        self.label.configure(fg=app['text_color'], bg="#000001")
-        self.attributes("-transparentcolor", "#000001")
-        self._redraw_canvas()
+    def detach(self, timer):
+        """The timer is gone, or is moving to another view."""
+        self.destroy()
 
-    def _update_timer(self):
-        if self.remaining_seconds > 0:
-            self._redraw_canvas()
-            self.remaining_seconds -= 1
-            self.animation_job = self.after(1000, self._update_timer)
-        else:
-            self.label.config(text="Done!")
-            if self.animation_job:
-                self.after_cancel(self.animation_job)
-            self.animation_job = None
-            self._flash_and_close()
+    def apply_config(self, changed=None):
+        if self.timer.finished: return # Flashing its completion; leave the alpha alone
+        everything = changed is None
+        cfg = self.config_manager.settings
+        if everything or 'window' in changed:
+            self.attributes("-alpha", cfg.opacity)
+        if everything:
+            self.attributes("-transparentcolor", "#000001")
+            self.canvas.config(bg=self.attributes("-transparentcolor"))
+        if everything or 'colors' in changed:
+            self.label.configure(fg=cfg.text_color, bg="#000001")
+            self.redraw()
+
+    def timer_finished(self, timer):
+        self.label.config(text="Done!"); self._label_text = "Done!"
+        self._flash_and_close()
 
     def _flash_and_close(self, count=6): # Flash 3 times (on/off)
         if count > 0:
@@ -463,71 +2211,220 @@ class CircularTimerWindow(tk.Toplevel):
         else:
             self._close_timer()
 
-    def _redraw_canvas(self):
-        self.canvas.delete("all")
+    @profiled("timer_redraw")
+    def redraw(self):
         w, h = self.winfo_width(), self.winfo_height()
         if w <= 1 or h <= 1: return
 
-        bg_color = self.config_manager.get('appearance.timer.background_color')
-        c1 = self.config_manager.get('appearance.timer.bar_color_1')
-        c2 = self.config_manager.get('appearance.timer.bar_color_2')
-        ring_width = self.config_manager.get('appearance.timer.ring_width')
+        cfg = self.config_manager.settings
+        self.scene.render(w, h, cfg.timer_ring_width, cfg.timer_segments, cfg.timer_background_color,
+                          cfg.timer_bar_color_1, cfg.timer_bar_color_2, self.timer.fraction)
+        text = self.timer.text
+        if text != self._label_text:
+            self.label.config(text=text); self._label_text = text
 
-        self.canvas.config(bg=self.attributes("-transparentcolor"))
+# --- Timer Dock ---
+class TimerDock(tk.Toplevel):
+    """Every docked timer as a ring in a grid on one shared canvas, redrawn in one pass per tick.
 
-        self.canvas.create_arc(
-            ring_width//2, ring_width//2, w-(ring_width//2), h-(ring_width//2),
-            start=0, extent=360, style=tk.ARC, width=ring_width-2, outline=bg_color
-        )
+    Drag the dock to move it; drag a ring out of it to turn that timer back into a
+    standalone window. Right-click a ring to close its timer.
+    """
+    CELL = 100 # px per ring
+    COLUMNS = 3
 
-        percentage_remaining = self.remaining_seconds / self.duration if self.duration > 0 else 0
-        self._create_gradient_arc(w/2, h/2, min(w,h)/2 - ring_width/2, ring_width, percentage_remaining, c1, c2)
+    def __init__(self, master, config_manager):
+        super().__init__(master)
+        self.master = master
+        self.config_manager = config_manager
+        self.timers = []; self.rings = {} # timer -> [RingScene, text item, text shown]
+        self.drag_info = {} # 'timer' pressed on, if any, and the WindowDrag moving the dock or a dragged-out ring
 
-        m, s = divmod(self.remaining_seconds, 60)
-        self.label.config(text=f"{int(m):02d}:{int(s):02d}")
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.configure(bg="black")
+        cfg = self.config_manager.settings
+        x = cfg.x + cfg.width + 20
+        if x + self.CELL > self.winfo_screenwidth(): x = cfg.x - self.CELL - 20
+        self.geometry(f"+{x}+{master.winfo_y() if master.winfo_ismapped() else cfg.y}")
 
-    def _create_gradient_arc(self, cx, cy, radius, width, percentage, c1, c2):
-        try:
-            c1_rgb = self.winfo_rgb(c1)
-            c2_rgb = self.winfo_rgb(c2)
-        except tk.TclError:
-            return
+        self.canvas = TrackerCanvas(self, bg="black", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<Button-3>", self._on_right_click)
+        track_visibility(self, self.canvas, self._on_visibility)
+        self.apply_config()
 
-        total_steps = int(360 * percentage)
-        if total_steps <= 0: return
+    def add(self, timer):
+        timer.view = self
+        self.timers.append(timer)
+        text = self.canvas.create_text(0, 0, text="", font=("Segoe UI", 12, "bold"), fill=self.config_manager.settings.text_color, tags="label")
+        self.rings[timer] = [RingScene(self.canvas), text, ""]
+        if self.state() == "withdrawn": self.deiconify()
+        self._layout()
+
+    def detach(self, timer):
+        """Removes the timer's ring; an empty dock hides until the next timer arrives."""
+        if timer not in self.rings: return
+        scene, text, _ = self.rings.pop(timer)
+        scene.clear(); self.canvas.delete(text)
+        self.timers.remove(timer)
+        if self.timers: self._layout()
+        else: self.withdraw()
+
+    def _layout(self):
+        cols = min(len(self.timers), self.COLUMNS); rows = math.ceil(len(self.timers) / cols)
+        self.geometry(f"{cols * self.CELL}x{rows * self.CELL}")
+        self.canvas.config(width=cols * self.CELL, height=rows * self.CELL)
+        for timer in self.timers:
+            x0, y0 = self._cell_origin(timer)
+            self.canvas.coords(self.rings[timer][1], x0 + self.CELL / 2, y0 + self.CELL / 2)
+        self.redraw(); self.canvas.tag_raise("label")
+
+    def _on_visibility(self, visible):
+        if visible: self.redraw() # Catch up on the ticks skipped while hidden
+        self.master.timer_scheduler.reschedule()
+
+    def _cell_origin(self, timer):
+        row, col = divmod(self.timers.index(timer), self.COLUMNS)
+        return col * self.CELL, row * self.CELL
+
+    def _timer_at(self, x, y):
+        index = int(y // self.CELL) * self.COLUMNS + int(x // self.CELL)
+        return self.timers[index] if 0 <= x < self.COLUMNS * self.CELL and 0 <= index < len(self.timers) else None
+
+    def _on_press(self, e):
+        timer = self._timer_at(e.x, e.y)
+        dock = timer is None or timer.finished # Dragging the dock itself
+        self.drag_info = {'timer': timer, 'drag': self.master.start_drag(self, e) if dock else None}
 
-        for i in range(total_steps):
-            angle = i - 90 # Start from top
-            rad = math.radians(angle)
-            
-            ratio = i / 360.0
-            r = int(c1_rgb[0] * (1 - ratio) + c2_rgb[0] * ratio)
-            g = int(c1_rgb[1] * (1 - ratio) + c2_rgb[1] * ratio)
-            b = int(c1_rgb[2] * (1 - ratio) + c2_rgb[2] * ratio)
-            color = f'#{r:04x}{g:04x}{b:04x}'
+    def _on_drag(self, e):
+        info = self.drag_info
+        if not info: return
+        if info['drag'] is not None: info['drag'].motion(e) # The dock, or a ring already dragged out
+        elif not info['timer'].finished and not (0 <= e.x < self.winfo_width() and 0 <= e.y < self.winfo_height()):
+            timer = info['timer']
+            self.detach(timer) # The ring left the dock: give it a window of its own
+            x, y = e.x_root - self.CELL // 2, e.y_root - self.CELL // 2
+            window = CircularTimerWindow(self.master, self.config_manager, timer, x, y)
+            info['drag'] = self.master.start_drag(window, e, geometry=(x, y, self.CELL, self.CELL))
 
-            x = cx + radius * math.cos(rad)
-            y = cy + radius * math.sin(rad)
-            self.canvas.create_oval(x-width/2, y-width/2, x+width/2, y+width/2, fill=color, outline=color)
+    def _on_release(self, e):
+        if self.drag_info.get('drag') is not None: self.drag_info['drag'].finish()
+        self.drag_info = {}
 
+    def _on_right_click(self, e):
+        timer = self._timer_at(e.x, e.y)
+        if timer is not None: self.master.remove_timer(timer)
+
+    def apply_config(self, changed=None):
+        everything = changed is None
+        cfg = self.config_manager.settings
+        if everything or 'window' in changed:
+            self.attributes("-alpha", cfg.opacity)
+        if everything:
+            self.attributes("-transparentcolor", "#000001")
+            self.canvas.config(bg="#000001")
+        if everything or 'colors' in changed:
+            for _, text, _ in self.rings.values(): self.canvas.itemconfig(text, fill=cfg.text_color)
+            self.redraw(); self.canvas.tag_raise("label") # A ring rebuilt for new settings lands above the labels
+
+    def timer_finished(self, timer):
+        self.redraw()
+        self.after(1500, lambda: self.master.remove_timer(timer) if timer in self.rings else None)
+
+    @profiled("timer_redraw")
+    def redraw(self):
+        """One pass over every ring; each RingScene only touches what changed."""
+        cfg = self.config_manager.settings
+        for timer in self.timers:
+            ring = self.rings[timer]
+            x0, y0 = self._cell_origin(timer)
+            ring[0].render(self.CELL, self.CELL, cfg.timer_ring_width, cfg.timer_segments, cfg.timer_background_color,
+                           cfg.timer_bar_color_1, cfg.timer_bar_color_2, timer.fraction, x0, y0)
+            label = timer.text
+            if label != ring[2]: self.canvas.itemconfig(ring[1], text=label); ring[2] = label
+
+# --- Profiler Overlay ---
+class ProfilerWindow(tk.Toplevel):
+    REFRESH_MS = 1000
+
+    def __init__(self, master):
+        from tkinter import ttk
+        super().__init__(master)
+        self.master = master
+        self.title("Profiler")
+        self.attributes("-topmost", True)
+        self.text = tk.Label(self, font=("Consolas", 9), justify="left", anchor="nw", padx=8, pady=8)
+        self.text.pack(fill="both", expand=True)
+        btn_frame = ttk.Frame(self, padding=(8, 0, 8, 8))
+        btn_frame.pack(fill="x")
+        ttk.Button(btn_frame, text="Dump JSON", command=master.dump_profile).pack(side="right", padx=(5, 0))
+        ttk.Button(btn_frame, text="Reset", command=PROFILER.reset).pack(side="right")
+        self._refresh()
+
+    def _refresh(self):
+        if not self.winfo_exists(): return
+        lines = [f"{'section':<18}{'p50 ms':>9}{'p99 ms':>9}{'calls/min':>11}"]
+        for name, st in sorted(PROFILER.stats().items()):
+            lines.append(f"{name:<18}{st['p50_ms']:>9.2f}{st['p99_ms']:>9.2f}{st['calls_per_min']:>11}")
+        if not PROFILER.enabled: lines.append("(profiling is off)")
+        counters = self.master.profile_counters()
+        frames = counters['animation_frames']
+        lines.append(f"frames rendered {frames['rendered']}, skipped {frames['skipped']}")
+        lines.append(f"timer wakeups {counters['timer_wakeups']}, update {counters['wakeups']['update']}, "
+                     f"config watch {counters['wakeups']['config_watch']}")
+        if counters['errors']: lines.append(f"errors caught {sum(counters['errors'].values())} (details in the dump)")
+        self.text.config(text="\n".join(lines))
+        self.after(self.REFRESH_MS, self._refresh)
 
 # --- Settings Window ---
 class SettingsWindow(tk.Toplevel):
+    """Built once on first open; closing only withdraws it, and reopening resyncs the values."""
     def __init__(self, master, config_manager):
         super().__init__(master)
         self.master = master
         self.config_manager = config_manager
-        self.temp_config = copy.deepcopy(config_manager.config)
         self.title("Settings")
         self.transient(master)
-        self.grab_set()
         self.protocol("WM_DELETE_WINDOW", self._on_close)
-        self.vars = {}
+        self.vars = {}; self.color_previews = {}
+        self.original_values = {} # key -> value before this session's first change, for Cancel
+        self._size = None
         self._create_widgets()
-        self.update_idletasks()
+        self.show()
+
+    def show(self):
+        if self.state() == "withdrawn":
+            self._sync_vars()
+            self.deiconify()
+        self.original_values = {}
         self.center_window()
+        self.grab_set(); self.lift()
+
+    def hide(self):
+        self.grab_release(); self.withdraw()
+        self.master.attributes("-topmost", True)
+
+    def _sync_vars(self):
+        """Pulls current config values into the controls (the config may have changed while hidden)."""
+        for k, var in self.vars.items():
+            value = self.config_manager.get(k)
+            try:
+                if var.get() == value: continue
+            except tk.TclError: pass # e.g. a spinbox left holding text that isn't a number
+            var.set(value)
+            if k in self.color_previews:
+                try: self.color_previews[k].config(bg=value)
+                except tk.TclError: pass
+        self._toggle_day_controls()
+        self._toggle_geo_controls()
 
     def _create_widgets(self):
+        from tkinter import ttk
+        self.ttk = ttk # Imported once here, for the _create_* helpers below
         main_frame = ttk.Frame(self, padding=15)
         main_frame.pack(expand=True, fill="both")
         main_frame.columnconfigure(0, weight=1)
@@ -562,6 +2459,8 @@ class SettingsWindow(tk.Toplevel):
         self.width_row = self._create_spin_slider(geo_lf, "Width", "geometry.width", 0, 4, 500, 1, "px")
         self.height_row = self._create_spin_slider(geo_lf, "Height", "geometry.height", 1, 50, 1000, 1, "px")
         self._create_checkbox(geo_lf, "Auto-Position", "behavior.auto_position", 2, self._toggle_geo_controls)
+        self._create_spin_slider(geo_lf, "Snap Distance", "behavior.snap_distance", 3, 0, 50, 1, "px")
+        self._create_checkbox(geo_lf, "Timers Follow Bar", "behavior.timers_follow_bar", 4)
         
         # --- Populate "Appearance" ---
         self._create_combobox(app_lf, "Theme", "appearance.theme", 0, list(self.config_manager.THEMES.keys()), self._apply_theme)
@@ -576,10 +2475,13 @@ class SettingsWindow(tk.Toplevel):
         self._create_color_picker(app_lf, "Timer Bar Start", "appearance.timer.bar_color_1", 9)
         self._create_color_picker(app_lf, "Timer Bar End", "appearance.timer.bar_color_2", 10)
         self._create_color_picker(app_lf, "Timer Background", "appearance.timer.background_color", 11)
+        self._create_spin_slider(app_lf, "Timer Segments", "appearance.timer.segments", 12, 0, 360, 1, "")
         
         # --- Populate "Behavior" ---
         self._create_combobox(beh_lf, "Display Text", "behavior.display_mode", 0, ["Percentage", "Time Remaining", "End Time"])
         self._create_checkbox(beh_lf, "Show Text Label", "behavior.show_text_label", 1)
+        self._create_spin_slider(beh_lf, "Animation FPS", "behavior.animation_fps", 2, 0, 120, 1, "")
+        self._create_checkbox(beh_lf, "Dock Timers", "behavior.timer_dock", 3)
 
         # --- Buttons ---
         btn_frame = ttk.Frame(main_frame, padding=(0, 10, 0, 0))
@@ -601,6 +2503,7 @@ class SettingsWindow(tk.Toplevel):
             for w in self.end_time_row: w.grid()
 
     def _toggle_geo_controls(self, event=None):
+        ttk = self.ttk
         auto_on = self.vars['behavior.auto_position'].get()
         state = "disabled" if auto_on else "normal"
         # Only disable the height controls, since width is still used in auto-mode
@@ -612,6 +2515,7 @@ class SettingsWindow(tk.Toplevel):
                       child.configure(state=state)
 
     def _create_control_row(self, parent, label_text, row):
+        ttk = self.ttk
         label = ttk.Label(parent, text=label_text)
         label.grid(row=row, column=0, sticky="w", padx=5, pady=2)
         control_frame = ttk.Frame(parent)
@@ -620,6 +2524,7 @@ class SettingsWindow(tk.Toplevel):
         return label, control_frame
 
     def _create_entry(self, p, l, k, r, validate_time=False):
+        ttk = self.ttk
         self.vars[k] = tk.StringVar(value=self.config_manager.get(k))
         lbl, c_frame = self._create_control_row(p, l, r)
         vcmd = (self.register(self._validate_time_format), '%P') if validate_time else None
@@ -628,6 +2533,7 @@ class SettingsWindow(tk.Toplevel):
         return lbl, c_frame
 
     def _create_combobox(self, p, l, k, r, v, cmd=None):
+        ttk = self.ttk
         self.vars[k] = tk.StringVar(value=self.config_manager.get(k))
         lbl, c_frame = self._create_control_row(p, l, r)
         c = ttk.Combobox(c_frame, textvariable=self.vars[k], values=v, state="readonly")
@@ -637,11 +2543,14 @@ class SettingsWindow(tk.Toplevel):
         return lbl, c_frame
 
     def _create_color_picker(self, p, l, k, r):
+        ttk = self.ttk
         self.vars[k] = tk.StringVar(value=self.config_manager.get(k))
         lbl, c_frame = self._create_control_row(p, l, r)
         prv = tk.Label(c_frame, text="   ", relief="sunken", borderwidth=1, bg=self.vars[k].get()); prv.pack(side="left", padx=(0,5))
+        self.color_previews[k] = prv
         e = ttk.Entry(c_frame, textvariable=self.vars[k]); e.pack(side="left", expand=True, fill="x")
         def pick():
+            from tkinter import colorchooser
             c = colorchooser.askcolor(title=f"Choose {l}", initialcolor=self.vars[k].get())
             if c and c[1]: self.vars[k].set(c[1].upper()); self._live_update(k, c[1]); prv.config(bg=c[1])
         b = ttk.Button(c_frame, text="...", width=3, command=pick); b.pack(side="left", padx=(5,0))
@@ -649,6 +2558,7 @@ class SettingsWindow(tk.Toplevel):
         return lbl, c_frame
     
     def _create_spin_slider(self, p, l, k, r, from_, to, step, unit=""):
+        ttk = self.ttk
         self.vars[k] = tk.DoubleVar(value=self.config_manager.get(k))
         lbl, c_frame = self._create_control_row(p, l, r)
         def update_from_spinbox(event=None):
@@ -668,6 +2578,7 @@ class SettingsWindow(tk.Toplevel):
         return lbl, c_frame
 
     def _create_checkbox(self, p, l, k, r, cmd=None):
+        ttk = self.ttk
         self.vars[k] = tk.BooleanVar(value=self.config_manager.get(k))
         lbl, c_frame = self._create_control_row(p, l, r)
         def on_toggle():
@@ -682,14 +2593,18 @@ class SettingsWindow(tk.Toplevel):
             current_config_val = self.config_manager.get(k)
             # Try to cast new value to the type of the old value to maintain type consistency
             value_to_set = type(current_config_val)(v)
+            if value_to_set == current_config_val: return
+            if k in self.color_previews: PALETTE.rgb(value_to_set) # Half-typed colors (e.g. "#2B2B2") stay out of the config
+            self.original_values.setdefault(k, current_config_val)
             self.config_manager.set(k, value_to_set)
-            self.master.apply_config()
+            self.master.request_apply(k)
         except (ValueError, tk.TclError, KeyError, IndexError): pass
 
     def _apply_theme(self, event=None):
         theme_name = self.vars['appearance.theme'].get()
         theme = self.config_manager.THEMES.get(theme_name)
         if theme:
+            for bar in self.master.bars: bar.fade_colors()
             for key, value in theme.items():
                 self.vars[f'appearance.{key}'].set(value)
                 self._live_update(f'appearance.{key}', value)
@@ -703,14 +2618,21 @@ class SettingsWindow(tk.Toplevel):
         except (ValueError, IndexError):
             return False
 
-    def _on_save(self): self.master.config_manager.save_config(); self.master.attributes("-topmost", True); self.destroy()
-    def _on_close(self): self.master.config_manager.config = self.temp_config; self.master.apply_config(); self.master.attributes("-topmost", True); self.destroy()
+    def _on_save(self): self.master.config_manager.save_config(); self.original_values = {}; self.hide()
+    def _on_close(self):
+        # Cancel: put back only the keys this session changed
+        for k, value in self.original_values.items():
+            self.config_manager.set(k, value); self.master.request_apply(k)
+        self.original_values = {}
+        self.hide()
 
     def center_window(self):
-        self.update_idletasks()
-        self.resizable(False, False) # Prevent resizing now that layout is fixed
+        if self._size is None: # Measure the layout once; it doesn't change between opens
+            self.update_idletasks()
+            self.resizable(False, False) # Prevent resizing now that layout is fixed
+            self._size = (self.winfo_width(), self.winfo_height())
         mx, my, mw = self.master.winfo_x(), self.master.winfo_y(), self.master.winfo_width()
-        ww, wh = self.winfo_width(), self.winfo_height()
+        ww, wh = self._size
         x, y = mx + mw + 10, my
         # Check if it goes off-screen to the right, and if so, place it on the left
         if x + ww > self.winfo_screenwidth(): 
@@ -720,10 +2642,182 @@ class SettingsWindow(tk.Toplevel):
             x = 10
         self.geometry(f'+{x}+{y}')
 
+# --- Simulation ---
+def simulate_day(config_manager, date, breaks=(), timers=(), states=None):
+    """Replays `date` headless on a SimulatedClock, through the bar's own schedule, delay
+    and render code, with a RecordingCanvas standing in for the screen.
+
+    Runs from midnight to midnight, or on until the day's work runs out. `breaks` are
+    ad-hoc (start, end) pairs and `timers` (start, seconds, label) triples, in epoch
+    seconds; every state change is appended to `states`. Animation is not simulated:
+    each update jumps straight to its target. Returns the counters.
+    """
+    global CLOCK
+    started_at = time.perf_counter()
+    start = datetime.datetime.combine(date, datetime.time()).timestamp()
+    previous, clock = CLOCK, SimulatedClock(start); CLOCK = clock
+    try:
+        cfg = config_manager.settings; h = cfg.height
+        schedule = DaySchedule(config_manager); journal = Journal()
+        canvas = RecordingCanvas(); scene = BarScene(canvas)
+        ring_canvas = RecordingCanvas(); rings = {} # CountdownTimer -> RingScene, laid out like the dock
+        events = sorted([(s, "break_start", ()) for s, _ in breaks] + [(e, "break_end", ()) for _, e in breaks] +
+                        [(t, "timer", (seconds, label)) for t, seconds, label in timers], key=lambda ev: ev[0])
+        counts = {"updates": 0, "redraws": 0, "timer_wakeups": 0, "ring_redraws": 0}
+        last_state = last_label = None; next_tick = start; next_timer = math.inf
+        remaining = 1; now = start; midnight = start + 86400
+        while now < midnight or (remaining > 0 and now < midnight + 86400):
+            while events and events[0][0] <= now:
+                t, kind, args = events.pop(0)
+                if kind == "break_start":
+                    schedule.start_break(t); journal.record("break_start", t)
+                elif kind == "break_end":
+                    begun = schedule.end_break(t)
+                    if begun is not None: journal.record("break_end", t, seconds=round(t - begun, 3))
+                else:
+                    timer = CountdownTimer(journal, *args)
+                    rings[timer] = RingScene(ring_canvas); next_timer = now
+                next_tick = now # Breaks move the bar's next change; a tick picks that up
+
+            if now >= next_tick:
+                counts["updates"] += 1
+                day = schedule.refresh(now)
+                total, remaining, percentage = bar_progress(day, now)
+                label = label_text(cfg.display_mode, remaining, percentage, day.end_label) if cfg.show_text_label else None
+                calls = canvas.calls
+                scene.render(cfg.width, h, min(cfg.corner_radius, cfg.width // 2, h // 2), cfg.background_color,
+                             *bar_colors(cfg, remaining), percentage, round(total / 3600))
+                if canvas.calls != calls or label != last_label: counts["redraws"] += 1; last_label = label
+                state = day_status(day, now, cfg.display_mode)
+                if state != last_state:
+                    last_state = state
+                    if states is not None: states.append({"t": round(now, 3), **state})
+                next_tick = now + next_change_delay(remaining, visible_steps(cfg, total, h), day.next_start - now,
+                                                    *day.rate_change(now), end_label_moves(cfg, day.on_break),
+                                                    cfg.update_interval_seconds, TrackerBar.MAX_UPDATE_INTERVAL)
+
+            if now >= next_timer: # Same wakeups as TimerScheduler with every view visible
+                counts["timer_wakeups"] += 1
+                for i, timer in enumerate(list(rings)):
+                    if timer.tick(now): rings.pop(timer).clear(); continue
+                    calls = ring_canvas.calls; row, col = divmod(i, TimerDock.COLUMNS)
+                    rings[timer].render(TimerDock.CELL, TimerDock.CELL, cfg.timer_ring_width, cfg.timer_segments,
+                                        cfg.timer_background_color, cfg.timer_bar_color_1, cfg.timer_bar_color_2,
+                                        timer.fraction, col * TimerDock.CELL, row * TimerDock.CELL)
+                    if ring_canvas.calls != calls: counts["ring_redraws"] += 1
+                next_timer = TimerScheduler.wake_at([t.deadline for t in rings], now, True)
+
+            now = min(next_tick, next_timer, events[0][0] if events else math.inf)
+            clock.advance_to(now)
+        journal.flush()
+    finally: CLOCK = previous
+    return {"date": date.isoformat(), "simulated_hours": round((now - start) / 3600, 2), **counts,
+            "canvas_calls": canvas.calls, "ring_canvas_calls": ring_canvas.calls,
+            "states": len(states) if states is not None else None,
+            "wall_ms": round((time.perf_counter() - started_at) * 1000, 1)}
+
+def simulate_visible(config_manager, date, breaks=(), timers=(), states=None, rate=60.0):
+    """Like simulate_day(), but runs the real window on a clock `rate` times faster than real time."""
+    global CLOCK
+    started_at = time.perf_counter()
+    start = datetime.datetime.combine(date, datetime.time()).timestamp()
+    previous, CLOCK = CLOCK, SimulatedClock(start, rate)
+    try:
+        app = TimeProgressBar(config_manager)
+        at = lambda t, fn: app.after(max(1, round((t - CLOCK.time()) / rate * 1000)), fn)
+        for s, e in breaks: at(s, app._start_break); at(e, app._end_break)
+        for t, seconds, label in timers: at(t, lambda seconds=seconds, label=label: app.start_timer(seconds, label))
+
+        tick = app._update_tick; last_state = [None]
+        def record_tick(): # Every update tick of the main bar goes through here
+            tick()
+            now = CLOCK.time(); state = day_status(app.schedule.refresh(now), now, config_manager.settings.display_mode)
+            if state != last_state[0]:
+                last_state[0] = state
+                if states is not None: states.append({"t": round(now, 3), **state})
+        app._update_tick = record_tick
+
+        def stop():
+            if CLOCK.time() < start + 86400 or (app.time_remaining_seconds > 0 and CLOCK.time() < start + 2 * 86400):
+                at(CLOCK.time() + 600, stop)
+            else: app.quit()
+        at(start + 86400, stop)
+        app.mainloop()
+        counters = app.profile_counters(); app.destroy(); app.journal.flush()
+        hours = round((CLOCK.time() - start) / 3600, 2)
+    finally: CLOCK = previous
+    return {"date": date.isoformat(), "simulated_hours": hours,
+            "updates": counters['wakeups']['update'], "redraws": counters['animation_frames']['rendered'],
+            "skipped_frames": counters['animation_frames']['skipped'], "timer_wakeups": counters['timer_wakeups'],
+            "states": len(states) if states is not None else None,
+            "wall_ms": round((time.perf_counter() - started_at) * 1000, 1)}
+
+def simulate_main(args, config_manager):
+    """--simulate [DATE]: replays a day with the --break and --timer events and prints the counters."""
+    import tempfile
+    try:
+        date = datetime.date.today() if args.simulate == "today" else datetime.date.fromisoformat(args.simulate)
+        at = lambda hhmm: datetime.datetime.combine(date, datetime.datetime.strptime(hhmm, "%H:%M").time()).timestamp()
+        breaks = []
+        for spec in args.breaks:
+            s, e = (at(part) for part in spec.split("-"))
+            breaks.append((s, e if e > s else e + 86400))
+        timers = []
+        for spec in args.timers:
+            when, _, rest = spec.partition("+"); minutes, _, label = rest.partition(",")
+            timers.append((at(when), float(minutes) * 60, label))
+    except ValueError as e:
+        print(f"Bad --simulate/--break/--timer value: {e}", file=sys.stderr); return 2
+
+    record = os.path.abspath(args.record) if args.record else None
+    states = []; cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="daytracker_sim_") as scratch:
+        os.chdir(scratch) # The journal, timers and config saves stay out of the real files
+        try:
+            if args.speed: report = simulate_visible(config_manager, date, breaks, timers, states, args.speed)
+            else: report = simulate_day(config_manager, date, breaks, timers, states)
+        finally: os.chdir(cwd)
+    for key, value in report.items(): print(f"{key:<18} {value}")
+    if record:
+        with open(record, 'w') as f: f.writelines(json.dumps(state) + "\n" for state in states)
+    return 0
+
+mark_startup("imports")
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Always-on-top vertical time tracker.")
+    parser.add_argument("--profile", action="store_true", help="time the hot paths and show the profiler overlay")
+    parser.add_argument("--startup-report", action="store_true", help="print import, config load and first paint times")
+    parser.add_argument("--status", action="store_true", help="print the day's progress once as JSON, without a window")
+    parser.add_argument("--watch", action="store_true", help="like --status, but print a line whenever it changes")
+    parser.add_argument("--control", action="store_true", help="accept commands on a local socket (see --send)")
+    parser.add_argument("--send", metavar="JSON", help="send a command to the running tracker and print the reply")
+    parser.add_argument("--simulate", nargs="?", const="today", metavar="DATE",
+                        help="replay a whole day (YYYY-MM-DD, default today) on a virtual clock and print update counts")
+    parser.add_argument("--break", dest="breaks", action="append", default=[], metavar="HH:MM-HH:MM",
+                        help="with --simulate: take an ad-hoc break (repeatable)")
+    parser.add_argument("--timer", dest="timers", action="append", default=[], metavar="HH:MM+MIN[,LABEL]",
+                        help="with --simulate: start a timer (repeatable)")
+    parser.add_argument("--speed", type=float, metavar="X",
+                        help="with --simulate: show the bar, running X times faster than real time (default: headless)")
+    parser.add_argument("--record", metavar="FILE", help="with --simulate: write every state change as a JSON line")
+    args = parser.parse_args()
+    if args.simulate is not None and not args.speed: # Headless: no display needed
+        sys.exit(simulate_main(args, ConfigManager()))
     try: 
+        PROFILER.enabled = args.profile
         config = ConfigManager()
+        mark_startup("config_loaded")
+        if args.simulate is not None: sys.exit(simulate_main(args, config))
         app = TimeProgressBar(config)
+        app.report_startup = args.startup_report
+        mark_startup("window_built")
+        if args.profile: app.open_profiler()
+        if args.control or config.settings.control_socket: app.start_control_server()
         app.mainloop()
+        if app.control_server is not None: app.control_server.close()
+        config.flush(); app.journal.flush()
     except Exception as e: 
+        from tkinter import messagebox
         messagebox.showerror("Fatal Error", f"An unrecoverable error occurred:\n{e}")
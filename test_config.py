@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+ConfigManager checks in a scratch directory; Tk-free, no display needed.
+
+    python -m pytest -q
+"""
+import json
+import os
+
+import pytest
+
+from daytracker import ConfigManager
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # No config file here: start from the defaults
+    return ConfigManager()
+
+def test_config_does_not_alias_the_defaults(config):
+    assert config.config['bars'] == ConfigManager.DEFAULT_CONFIG['bars']
+    assert config.config['bars'] is not ConfigManager.DEFAULT_CONFIG['bars']
+    config.config['bars'].append({"start_time": "13:00"})
+    assert ConfigManager.DEFAULT_CONFIG['bars'] == []
+
+def test_flush_writes_the_pending_save(config):
+    config.set("start_time", "10:00"); config.save_config(); config.flush()
+    with open(ConfigManager.CONFIG_FILE) as f: assert json.load(f)["start_time"] == "10:00"
+
+def test_save_keeps_the_file_mode(config):
+    config.save_config(); config.flush()
+    os.chmod(ConfigManager.CONFIG_FILE, 0o644)
+    config.set("start_time", "10:00"); config.save_config(); config.flush()
+    assert os.stat(ConfigManager.CONFIG_FILE).st_mode & 0o777 == 0o644
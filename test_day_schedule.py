@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+DaySchedule checks on fixed local times; Tk-free, no display needed.
+
+    python -m pytest -q
+"""
+import datetime
+
+import pytest
+
+from daytracker import ConfigManager, DaySchedule
+
+HOUR = 3600
+
+def at(h, m=0, day=14):
+    """Epoch seconds for 2026-10-<day> h:m local time (the 14th is a Wednesday)."""
+    return datetime.datetime(2026, 10, day, h, m).timestamp()
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # No config file here: start from the defaults
+    return ConfigManager()
+
+def day_at(config, now, **keys):
+    for key_path, value in keys.items(): config.set(key_path.replace("__", "."), value)
+    return DaySchedule(config).refresh(now)
+
+def test_start_and_duration(config):
+    day = day_at(config, at(12), start_time="09:00", behavior__duration_hours=8.0)
+    assert day.remaining(at(12)) == 5 * HOUR
+    assert day.end_time == "17:00" and day.end_label == "Ends 17:00"
+
+def test_night_shift_across_midnight(config):
+    day = day_at(config, at(2, day=15), start_time="22:00", behavior__duration_hours=8.0)
+    assert day.start == at(22) and day.end == at(6, day=15)
+    assert day.remaining(at(2, day=15)) == 4 * HOUR
+
+def test_split_night_shift_stays_one_day(config):
+    spans = [["02:30", "06:00"], ["22:00", "02:00"]]
+    day = day_at(config, at(3, day=15), schedule={"intervals": spans})
+    assert day.intervals == [(at(22), at(2, day=15)), (at(2, 30, day=15), at(6, day=15))]
+    assert day.remaining(at(3, day=15)) == 3 * HOUR
+
+def test_ad_hoc_break_pushes_the_end_back(config):
+    day = day_at(config, at(10), start_time="09:00", behavior__duration_hours=8.0)
+    day.start_break(at(10)); day.end_break(at(10, 30))
+    assert day.break_seconds(at(12)) == 30 * 60
+    assert day.projected_end(at(12)) == at(17, 30)
+    assert day.refresh(at(12)).end_label == "Ends 17:30"
+
+def test_running_break_stops_work_time(config):
+    day = day_at(config, at(10), start_time="09:00", behavior__duration_hours=8.0)
+    day.start_break(at(10))
+    assert day.on_break and day.remaining(at(11)) == day.remaining(at(10)) == 7 * HOUR
+
+def test_planned_breaks_are_cut_out(config):
+    day = day_at(config, at(9), schedule={"intervals": [["09:00", "17:00"]], "breaks": [["12:00", "13:00"]]})
+    assert day.intervals == [(at(9), at(12)), (at(13), at(17))]
+    assert day.total_seconds == 7 * HOUR
+    assert day.scheduled_work(at(12, 30)) == 3 * HOUR # Nothing accrues during the break
+    assert day.scheduled_work(at(13, 30)) == 3.5 * HOUR
+    assert day.time_at_work(3.5 * HOUR) == at(13, 30)
+    working, until_change = day.rate_change(at(12, 15))
+    assert not working and until_change == 45 * 60
+
+def test_interval_order_does_not_matter(config):
+    day = day_at(config, at(10), schedule={"intervals": [["13:30", "17:30"], ["09:00", "12:30"]]})
+    assert day.intervals == [(at(9), at(12, 30)), (at(13, 30), at(17, 30))]
+    assert day.remaining(at(10)) == 6.5 * HOUR
+
+def test_overtime_past_the_last_interval(config):
+    day = day_at(config, at(18), schedule={"intervals": [["09:00", "17:00"]]})
+    assert day.scheduled_work(at(18)) == 9 * HOUR
+    assert day.remaining(at(18)) == -HOUR # Negative once the day is over
+
+def test_rollover_before_start_shows_yesterday(config):
+    day = day_at(config, at(8), start_time="09:00", behavior__duration_hours=8.0)
+    assert day.start == at(9, day=13) and day.remaining(at(8)) < 0
+    assert day.next_start == at(9)
+    assert day.refresh(at(9, 30)).start == at(9) # Rebuilt once the new day starts
+
+def test_weekday_override_and_day_off(config):
+    weekdays = {"wed": {"intervals": [["09:00", "13:00"]]}, "thu": {"intervals": []}}
+    day = day_at(config, at(10), schedule={"weekdays": weekdays}, start_time="09:00")
+    assert day.total_seconds == 4 * HOUR
+    assert day.next_start == at(9, day=16) # Thursday is skipped
+    day.refresh(at(10, day=15)) # A day off keeps showing the last workday, finished
+    assert day.start == at(9) and day.remaining(at(10, day=15)) < 0
+
+def test_first_day_after_a_day_off(config):
+    weekdays = {"sat": {"intervals": []}, "sun": {"intervals": []}}
+    day = day_at(config, at(8, day=19), schedule={"weekdays": weekdays}, start_time="09:00") # Monday
+    assert day.next_start == at(9, day=19)
+    day.refresh(at(10, day=19))
+    assert day.start == at(9, day=19) and day.remaining(at(10, day=19)) == 7 * HOUR
+
+@pytest.mark.parametrize("schedule", [
+    {"intervals": [["9", "17"]]},
+    {"breaks": [["12:00"]]},
+    {"intervals": "09:00-17:00"},
+    {"weekdays": {"wed": {"intervals": [["09:00"]]}}},
+    "not an object",
+])
+def test_malformed_schedule_falls_back(config, schedule):
+    day = day_at(config, at(10), schedule=schedule, start_time="09:00", behavior__duration_hours=8.0)
+    assert day.intervals == [(at(9), at(17))]
+
+def test_malformed_start_time_falls_back(config):
+    config.set("start_time", "9")
+    assert config.settings.start_time == ConfigManager.DEFAULT_CONFIG["start_time"]